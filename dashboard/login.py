@@ -1,21 +1,23 @@
 import streamlit as st
-import sys, os, time
+import sys, os
 
 # --- Ensure root directory is in sys.path ---
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from utils.auth_cookie import set_auth_cookie, is_authenticated
+from utils.auth_cookie import set_auth_cookie, is_authenticated, inject_navigation_blocker
+from utils.flash import redirect, show_flashes
 
 # --- Streamlit Page Config ---
 st.set_page_config(page_title="Login", page_icon="🔐", layout="centered")
 
 if is_authenticated():
-    st.success("✅ Already logged in! Redirecting...")
-    time.sleep(0.5)
-    st.switch_page("pages/1_Users.py")
-    st.stop()
+    redirect("pages/1_Users.py", "Already logged in!", icon="✅")
+
+# Toasts queued by the page that sent us here (logout, auth guard)
+show_flashes()
+inject_navigation_blocker()
 
 # --- Hide Sidebar ---
 st.markdown("""
@@ -67,13 +69,8 @@ if st.button("Login"):
         # ✅ Set authentication FIRST
         set_auth_cookie()
 
-        # ✅ Then show success message
-        st.success("✅ Login successful! Redirecting...")
-
-        # ✅ Wait a bit for session state to propagate
-        time.sleep(0.5)
-
-        st.rerun()
+        # ✅ Session state is set synchronously, go straight to the dashboard
+        redirect("pages/1_Users.py", "Login successful!", icon="✅")
 
     elif username != correct_username and password == correct_password:
         st.session_state.username_error = "Incorrect username"
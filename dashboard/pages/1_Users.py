@@ -6,239 +6,63 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from utils.auth_cookie import is_authenticated, inject_back_button_limiter, clear_auth, inject_navigation_blocker
+from utils.flash import redirect, rerun_with
+from utils.layout import log_render_time, setup_page
+from utils import api_client
+from utils.lazy_imports import lazy_import
+from utils.user_directory import USER_PAGE_SIZES, USER_SORT_FIELDS, fetch_users_page, get_user_directory
+from utils.user_import import IMPORT_COLUMNS, IMPORT_FILE_TYPES, UserImport
+from utils.validation import (USER_PERSONAS, sanitize_phone_number, validate_name, validate_notes,
+                              validate_phone_number, validate_topics)
 
 # ===== NOW CONTINUE WITH REGULAR IMPORTS =====
-import pandas as pd
 import streamlit as st
-import time
 import requests
-import re
-import html
-
-# --- Streamlit Page Config ---
-st.set_page_config(page_title="Users", page_icon="👥", layout="wide")
-# --- CRITICAL FIX: Add initialization flag to prevent premature checks ---
-if 'auth_initialized' not in st.session_state:
-    st.session_state.auth_initialized = False
-
-# --- Show loading screen during first load ---
-if not st.session_state.auth_initialized:
-    with st.spinner("Loading..."):
-        time.sleep(0.3)  # Give time for session restoration
-        st.session_state.auth_initialized = True
-        st.rerun()
-
-# --- NOW check authentication (after initialization) ---
-inject_back_button_limiter()
-
-if not is_authenticated():
-    st.warning("⚠️ You are not logged in. Redirecting to login page...")
-    time.sleep(0.5)
-    st.switch_page("login.py")
-    st.stop()
-
-# --- 1. HIDE THE DEFAULT NAVIGATION SIDEBAR ---
-st.markdown(
-    """
-    <style>
-        [data-testid="stSidebarNav"] {
-            display: none;
-        }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
-
-
-# --- VALIDATION FUNCTIONS ---
-def sanitize_phone_number(phone):
-    """
-    Sanitizes phone number by removing all non-numeric characters except + at the start.
-    Returns: sanitized_phone_number
-    """
-    if not phone:
-        return ""
+import time
 
-    # Keep + if it's at the beginning
-    has_plus = phone.strip().startswith('+')
+pd = lazy_import("pandas")  # only the Existing Users table needs it
 
-    # Remove all non-numeric characters
-    cleaned = re.sub(r'[^0-9]', '', phone)
+# --- Page config, auth guard and admin sidebar ---
+setup_page("Users", "👥")
 
-    # Add back the + if it was there
-    if has_plus:
-        cleaned = '+' + cleaned
 
-    return cleaned
+# --- PHONE UNIQUENESS ---
+PHONE_LOOKUP_TTL = 60  # seconds
 
 
-def validate_phone_number(phone, raw_phone=""):
+@st.cache_data(ttl=PHONE_LOOKUP_TTL, show_spinner=False)
+def fetch_phone_index():
     """
-    Validates phone number with comprehensive checks.
-    Returns: (is_valid, error_message, sanitized_phone)
+    Builds a sanitized phone -> user name index from the shared user directory (the full user list).
+    Used by the Add User check when the backend has no GET /users/exists endpoint,
+    and by every bulk import to seed UserImport with the numbers already registered.
     """
-    if not phone:
-        return False, "Phone number is required", ""
-
-    # Store raw input for potential re-display
-    if not raw_phone:
-        raw_phone = phone
-
-    # Sanitize the phone number
-    sanitized = sanitize_phone_number(phone)
-
-    if not sanitized:
-        return False, "Please enter a valid phone number", ""
-
-    # Check if it contains only + (at start) and digits
-    if sanitized.startswith('+'):
-        digits_only = sanitized[1:]
-    else:
-        digits_only = sanitized
-
-    if not digits_only.isdigit():
-        return False, "Phone number must contain only digits", ""
+    users = get_user_directory().users()
+    return {sanitize_phone_number(user.get('phone', '')): user.get('name', 'Unknown') for user in users}
 
-    # Check length (8-15 digits, not counting the +)
-    if len(digits_only) < 8:
-        return False, "Phone number must be at least 8 digits long", ""
 
-    if len(digits_only) > 15:
-        return False, "Phone number cannot exceed 15 digits", ""
-
-    # Check for invalid patterns (repeated digits, sequential patterns)
-    # Pattern 1: All same digits (e.g., 1111111111)
-    if re.match(r'^(\d)\1+$', digits_only):
-        return False, "Phone number cannot contain only repeated digits (e.g., 111111)", ""
-
-    # Pattern 2: Simple repeating patterns (e.g., 121212, 123123)
-    if len(digits_only) >= 6:
-        # Check for patterns like 121212
-        if re.match(r'^(\d{2})\1{2,}$', digits_only) or re.match(r'^(\d{3})\1{2,}$', digits_only):
-            return False, "Phone number contains an invalid repeating pattern", ""
-
-    return True, "", sanitized
-
-
-def validate_name(name):
+@st.cache_data(ttl=PHONE_LOOKUP_TTL, show_spinner=False)
+def lookup_phone_owner(sanitized_phone):
     """
-    Validates the name field with comprehensive checks.
-    Returns: (is_valid, error_message)
+    Returns the name of the user registered with this SANITIZED phone number, or None.
+    Asks GET /users/exists?phone=...; falls back to the cached phone index.
     """
-    if not name:
-        return False, "Name is required"
-
-    # Check for leading or trailing whitespace BEFORE trimming
-    if name != name.strip():
-        return False, "Name cannot have leading or trailing spaces"
-
-    # Trim whitespace for further checks
-    name = name.strip()
-
-    if not name:
-        return False, "Name cannot be only whitespace"
-
-    # Check length (min 2, max 100)
-    if len(name) < 2:
-        return False, "Name must be at least 2 characters long"
+    response = api_client.get("/users/exists", params={"phone": sanitized_phone})
+    if response.status_code == 200:
+        data = response.json()
+        if isinstance(data, dict) and "exists" in data:
+            return (data.get('name') or 'Unknown') if data['exists'] else None
+    return fetch_phone_index().get(sanitized_phone)
 
-    if len(name) > 100:
-        return False, "Name cannot exceed 100 characters"
 
-    # Check for consecutive repeated characters (e.g., "aaaaaaa")
-    if re.search(r'(.)\1{9,}', name):  # 10 or more same characters in a row
-        return False, "Name contains too many repeated characters"
+def invalidate_user_caches():
+    """Forget cached phone lookups and revalidate the user directory after a user is created, edited or archived"""
+    lookup_phone_owner.clear()
+    fetch_phone_index.clear()
+    get_user_directory().invalidate()
 
-    # Allow: letters (including accented), spaces, dots, hyphens, apostrophes
-    pattern = r"^[a-zA-ZÀ-ÿ\s.\-']+$"
 
-    if not re.match(pattern, name):
-        return False, "Name can only contain letters, spaces, dots, hyphens, and apostrophes. No numbers or special characters."
-
-    # Check for multiple consecutive spaces
-    if '  ' in name:
-        return False, "Name cannot contain multiple consecutive spaces"
-
-    # XSS check - detect HTML/script tags
-    if re.search(r'<[^>]*>', name):
-        return False, "Name cannot contain HTML tags"
-
-    return True, ""
-
-
-def validate_topics(topics_str):
-    """
-    Validates and sanitizes the topics field.
-    Returns: (is_valid, error_message, cleaned_topics_list)
-    """
-    if not topics_str or not topics_str.strip():
-        return False, "At least one topic is required", []
-
-    # Split by comma
-    topics_list = [topic.strip() for topic in topics_str.split(',')]
-
-    # Remove empty strings
-    topics_list = [topic for topic in topics_list if topic]
-
-    if not topics_list:
-        return False, "Please provide at least one valid topic", []
-
-    # Check for XSS in topics
-    for topic in topics_list:
-        if re.search(r'<[^>]*>', topic):
-            return False, "Topics cannot contain HTML tags", []
-
-    # Normalize: convert to lowercase and remove duplicates
-    topics_list = list(set([topic.lower() for topic in topics_list]))
-
-    # Check max topics limit (e.g., 10)
-    if len(topics_list) > 10:
-        return False, "Maximum 10 topics allowed", []
-
-    # Check individual topic length
-    for topic in topics_list:
-        if len(topic) > 50:
-            return False, "Each topic must be 50 characters or less", []
-        if len(topic) < 2:
-            return False, "Each topic must be at least 2 characters", []
-        # Check for repeated characters in topics
-        if re.search(r'(.)\1{9,}', topic):
-            return False, "Topic contains too many repeated characters", []
-
-    return True, "", topics_list
-
-
-def validate_notes(notes):
-    """
-    Validates the notes field for security and length.
-    Returns: (is_valid, error_message, sanitized_notes)
-    """
-    if not notes:
-        return True, "", ""  # Notes are optional
-
-    # Trim
-    notes = notes.strip()
-
-    # Check length (max 1000 characters)
-    if len(notes) > 1000:
-        return False, f"Notes cannot exceed 1000 characters (current: {len(notes)})", notes
-
-    # Check for repeated characters
-    if re.search(r'(.)\1{49,}', notes):  # 50 or more same characters
-        return False, "Notes contain too many repeated characters", notes
-
-    # XSS Protection: Escape HTML entities
-    sanitized_notes = html.escape(notes)
-
-    # Check if HTML was detected
-    if sanitized_notes != notes:
-        return False, "Notes cannot contain HTML tags or special characters like <, >, &", notes
-
-    return True, "", sanitized_notes
-
-
-def check_phone_exists(phone, backend_url):
+def check_phone_exists(phone):
     """
     Checks if a user with the same phone number already exists in the database.
     CRITICAL: Compares SANITIZED phone numbers.
@@ -248,92 +72,23 @@ def check_phone_exists(phone, backend_url):
         # Sanitize the input phone number first
         sanitized_input = sanitize_phone_number(phone)
 
-        response = requests.get(f"{backend_url}/users/")
-        if response.status_code == 200:
-            users = response.json()
-            # Compare SANITIZED phone numbers
-            for user in users:
-                existing_phone = user.get('phone', '')
-                sanitized_existing = sanitize_phone_number(existing_phone)
-
-                if sanitized_input == sanitized_existing:
-                    return True, f"This phone number is already registered to another user: {user.get('name', 'Unknown')}"
-            return False, ""
+        owner = lookup_phone_owner(sanitized_input)
+        if owner is not None:
+            return True, f"This phone number is already registered to another user: {owner}"
+        return False, ""
+    except requests.exceptions.HTTPError:
         return False, "Could not verify if phone number exists"
     except Exception as e:
         return False, f"Connection error while checking phone number: {str(e)}"
 
 
-# --- CUSTOM SIDEBAR ---
-def custom_sidebar():
-    with st.sidebar:
-        st.title("Admin Menu")
-        st.page_link("pages/1_Users.py", label="Users", icon="👥")
-        st.page_link("pages/2_Schedules.py", label="Schedules", icon="🗓️")
-        st.page_link("pages/3_Call_Console.py", label="Call Console", icon="📞")
-        st.page_link("pages/4_Analytics.py", label="Analytics", icon="📊")
-        st.page_link("pages/5_Settings.py", label="Settings", icon="⚙️")
-        st.page_link("pages/6_Tech_Stack.py", label="Tech Stack", icon="💻")
-        st.markdown("---")
-
-        # Show session info
-        if st.session_state.get('login_time'):
-            from datetime import datetime
-            try:
-                login_time = datetime.fromisoformat(st.session_state.login_time)
-                st.caption(f"🕐 Logged in: {login_time.strftime('%I:%M %p')}")
-            except:
-                pass
-
-        # Initialize logout confirmation state
-        if 'show_logout_confirmation' not in st.session_state:
-            st.session_state.show_logout_confirmation = False
-
-        # Logout button - triggers confirmation dialog
-        if st.button("🚪 Logout", key="logout_button", use_container_width=True, type="primary"):
-            st.session_state.show_logout_confirmation = True
-            st.rerun()
-
-    # Logout Confirmation Dialog (outside sidebar)
-    if st.session_state.get('show_logout_confirmation', False):
-        @st.dialog("Confirm Logout")
-        def logout_confirmation_dialog():
-            st.warning("⚠️ Are you sure you want to logout?")
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                if st.button("✅ Yes, Logout", type="primary", use_container_width=True):
-                    # Clear authentication
-                    clear_auth()
-
-                    # Clear all session state except auth flags
-                    keys_to_preserve = ['authenticated', 'logout_triggered']
-                    for key in list(st.session_state.keys()):
-                        if key not in keys_to_preserve:
-                            del st.session_state[key]
-
-                    st.success("✅ Logged out successfully!")
-                    inject_navigation_blocker()
-
-                    time.sleep(0.5)
-                    st.switch_page("login.py")
-
-            with col2:
-                if st.button("❌ Cancel", use_container_width=True):
-                    st.session_state.show_logout_confirmation = False
-                    st.rerun()
-
-        logout_confirmation_dialog()
-
-
-custom_sidebar()
-backend_url = "http://127.0.0.1:8000"
 st.title("User Management")
 
 # --- Initialize session_state ---
 if "show_add_user_form" not in st.session_state:
     st.session_state["show_add_user_form"] = False
+if "show_bulk_import" not in st.session_state:
+    st.session_state["show_bulk_import"] = False
 
 if 'show_memory_dialog' not in st.session_state:
     st.session_state.show_memory_dialog = False
@@ -360,8 +115,8 @@ def display_edit_form(user_info):
         st.markdown("---")
 
         # Persona field
-        edited_persona = st.selectbox("Persona *", ["Friendly", "Calm", "Cheerful"],
-                                      index=["Friendly", "Calm", "Cheerful"].index(
+        edited_persona = st.selectbox("Persona *", USER_PERSONAS,
+                                      index=USER_PERSONAS.index(
                                           user_info.get('persona', 'Friendly')))
 
         # Topics field with validation
@@ -400,12 +155,11 @@ def display_edit_form(user_info):
 
                     try:
                         user_id = user_info['id']
-                        response = requests.put(f"{backend_url}/users/{user_id}", json=update_payload)
+                        response = api_client.put(f"/users/{user_id}", json=update_payload)
                         if response.status_code == 200:
-                            st.toast("User updated successfully!", icon="✅")
+                            invalidate_user_caches()
                             del st.session_state['user_to_edit']
-                            time.sleep(0.5)
-                            st.rerun()
+                            rerun_with("User updated successfully!", icon="✅")
                         else:
                             st.error(f"Failed to update user. Error: {response.text}")
                     except Exception as e:
@@ -428,22 +182,24 @@ if 'user_to_edit' in st.session_state:
 # Otherwise, show the normal page content.
 else:
     # --- UI Controls ---
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     if col1.button("Add User"):
         st.session_state["show_add_user_form"] = True
+        st.session_state["show_bulk_import"] = False
         # Reset form fields
         st.session_state.form_name = ""
         st.session_state.form_phone = ""
         st.session_state.form_topics = ""
         st.session_state.form_notes = ""
-    if col2.button("Existing Users"):
+    if col2.button("Bulk Import"):
+        st.session_state["show_bulk_import"] = True
+        st.session_state["show_add_user_form"] = False
+    if col3.button("Existing Users"):
         st.session_state["show_add_user_form"] = False
+        st.session_state["show_bulk_import"] = False
 
     # --- Add User Form ---
     if st.session_state["show_add_user_form"]:
-        with st.spinner("Loading Form..."):
-            time.sleep(0.5)
-
         st.subheader("New User Details")
 
         # Name field with validation
@@ -484,7 +240,7 @@ else:
                 st.info(f"📱 Sanitized format: {sanitized_phone}")
 
                 # Check if phone already exists
-                phone_exists, exists_error = check_phone_exists(phone, backend_url)
+                phone_exists, exists_error = check_phone_exists(phone)
                 if phone_exists:
                     st.error(f"❌ {exists_error}")
                     phone_valid = False
@@ -492,7 +248,7 @@ else:
                     st.success("✓ Valid and unique phone number")
 
         # Persona field
-        persona = st.selectbox("Persona *", ["Friendly", "Calm", "Cheerful"])
+        persona = st.selectbox("Persona *", USER_PERSONAS)
 
         # Topics field with validation
         topics = st.text_area("Preferred Topics (comma-separated) *",
@@ -549,7 +305,6 @@ else:
 
                 if all_valid:
                     # Proceed with user creation using SANITIZED phone number
-                    endpoint = backend_url + "/users/"
                     user_data = {
                         "name": name.strip(),
                         "phone": sanitized_phone,  # Store sanitized phone
@@ -559,17 +314,16 @@ else:
                     }
 
                     try:
-                        response = requests.post(endpoint, json=user_data)
+                        response = api_client.post("/users/", json=user_data)
                         if response.status_code == 200:
-                            st.success("✅ User added successfully!")
+                            invalidate_user_caches()
                             st.session_state["show_add_user_form"] = False
                             # Clear form fields
                             st.session_state.form_name = ""
                             st.session_state.form_phone = ""
                             st.session_state.form_topics = ""
                             st.session_state.form_notes = ""
-                            time.sleep(1)
-                            st.rerun()
+                            rerun_with("User added successfully!", icon="✅")
                         else:
                             st.error("Failed to add user. Backend returned an error:")
                             try:
@@ -593,8 +347,58 @@ else:
                 st.session_state.form_notes = ""
                 st.rerun()
 
+    # --- Bulk Import ---
+    if st.session_state["show_bulk_import"]:
+        st.subheader("Bulk Import Users")
+        st.caption(f"Upload a CSV or Excel file with the columns: {', '.join(IMPORT_COLUMNS)}. "
+                   "Topics are comma-separated, persona defaults to Friendly and notes are optional. "
+                   "Rows use the same rules as the Add User form; phone numbers that are already registered "
+                   "or repeated in the file are skipped.")
+
+        uploaded_file = st.file_uploader("Users file", type=list(IMPORT_FILE_TYPES), key="bulk_import_file")
+
+        if st.button("📥 Import Users", type="primary", disabled=uploaded_file is None):
+            progress = st.empty()
+
+            def show_progress(rows_read, created):
+                progress.info(f"⏳ {rows_read} row(s) read, {created} user(s) created...")
+
+            started = time.perf_counter()
+            user_import = None
+            try:
+                # Sanitized phones of every registered user; rows imported here are added once created
+                user_import = UserImport(set(fetch_phone_index()))
+                user_import.run(uploaded_file, on_progress=show_progress)
+                progress.empty()
+            except ValueError as e:
+                progress.error(f"Could not read {uploaded_file.name}: {e}")
+            except requests.exceptions.ConnectionError:
+                progress.error("Connection Error: Could not connect to the backend. Is it running?")
+            except requests.exceptions.RequestException as e:
+                progress.error(f"Backend error during import: {e}")
+            finally:
+                # Keep whatever was imported before a failure
+                if user_import is not None:
+                    invalidate_user_caches()
+                    print(f"📥 Imported {user_import.created} user(s) from {uploaded_file.name} in "
+                          f"{time.perf_counter() - started:.1f}s, {len(user_import.report)} row(s) skipped")
+                    st.session_state["bulk_import_result"] = (uploaded_file.name, user_import.created,
+                                                              sorted(user_import.report))
+
+        if st.session_state.get("bulk_import_result"):
+            file_name, created, report = st.session_state["bulk_import_result"]
+            st.markdown(f"**Last import:** {file_name}")
+            result_col1, result_col2 = st.columns(2)
+            result_col1.metric("Users created", created)
+            result_col2.metric("Rows skipped", len(report))
+            if report:
+                report_df = pd.DataFrame(report, columns=["Row", "Name", "Phone", "Error"])
+                st.dataframe(report_df, hide_index=True, use_container_width=True)
+                st.download_button("⬇️ Download error report", report_df.to_csv(index=False),
+                                   file_name="user_import_errors.csv", mime="text/csv")
+
     # --- Existing Users Display ---
-    if not st.session_state["show_add_user_form"]:
+    if not st.session_state["show_add_user_form"] and not st.session_state["show_bulk_import"]:
         st.subheader("Existing Users")
 
         dialog_placeholder = st.empty()
@@ -609,75 +413,105 @@ else:
                     st.session_state.show_memory_dialog = False
                     st.rerun()
 
+        search_col, sort_col, order_col, size_col = st.columns([3, 1, 1, 1])
+        search = search_col.text_input("Search", placeholder="Name, phone or topic", key="users_search")
+        sort_field = sort_col.selectbox("Sort by", USER_SORT_FIELDS, format_func=str.title, key="users_sort")
+        sort_order = order_col.selectbox("Order", ["asc", "desc"],
+                                         format_func=lambda order: "Ascending" if order == "asc" else "Descending",
+                                         key="users_order")
+        page_size = size_col.selectbox("Page size", USER_PAGE_SIZES, index=1, key="users_page_size")
+
+        # Restart from the first page whenever the query changes
+        users_query = (search.strip(), sort_field, sort_order, page_size)
+        if st.session_state.get('users_query') != users_query:
+            st.session_state.users_query = users_query
+            st.session_state.users_cursors = [None]
+
         try:
-            response = requests.get(backend_url + "/users/")
-            if response.status_code == 200:
-                users_data = response.json()
-                if users_data:
-                    df = pd.DataFrame(users_data)
-                    st.session_state['users_df'] = df
-
-                    # Include phone in display
-                    display_columns = ['name', 'phone', 'persona', 'topics', 'notes']
-                    df_display = df[display_columns].copy()
-                    df_display['Action'] = ""
-
-                    edited_df = st.data_editor(
-                        df_display, hide_index=True, use_container_width=True,
-                        disabled=['name', 'phone', 'persona', 'topics', 'notes'],
-                        column_config={
-                            "phone": st.column_config.TextColumn("Phone Number"),
-                            "Action": st.column_config.SelectboxColumn(
-                                "Action",
-                                options=["", "📞 Start Call", "🧠 View Memory", "✏️ Edit", "🗑️ Archive"],
-                                help="Choose an action for this user",
-                            ),
-                            "topics": st.column_config.ListColumn("Topics"),
-                        }
-                    )
-
-                    action_row_index = edited_df[edited_df['Action'] != ""].index
-                    if not action_row_index.empty:
-                        idx = action_row_index[0]
-                        selected_action = edited_df.loc[idx, "Action"]
-                        user_info = st.session_state['users_df'].iloc[idx].to_dict()
-
-                        if selected_action == "📞 Start Call":
-                            st.session_state['user_for_call'] = user_info
-                            print("🔍 USER OBJECT DEBUG:")
-                            print(f"   Full user object: {st.session_state['user_for_call']}")
-                            print(f"   Keys: {list(st.session_state['user_for_call'].keys())}")
-                            st.success(f"Preparing call for {user_info['name']}...")
-                            st.switch_page("pages/3_Call_Console.py")
-
-                        elif selected_action == "🧠 View Memory":
-                            if not st.session_state.show_memory_dialog:
-                                st.session_state.selected_user_for_dialog = user_info
-                                st.session_state.show_memory_dialog = True
-                                st.rerun()
-
-                        elif selected_action == "✏️ Edit":
-                            st.session_state['user_to_edit'] = user_info
+            users_data, next_cursor, total_users = fetch_users_page(
+                page_size, st.session_state.users_cursors[-1], sort_field, sort_order, search
+            )
+            if users_data:
+                # Only the visible page is held in the editor
+                df = pd.DataFrame(users_data)
+                st.session_state['users_df'] = df
+
+                # Include phone in display
+                display_columns = ['name', 'phone', 'persona', 'topics', 'notes']
+                df_display = df.reindex(columns=display_columns)
+                df_display['Action'] = ""
+
+                edited_df = st.data_editor(
+                    df_display, hide_index=True, use_container_width=True,
+                    disabled=['name', 'phone', 'persona', 'topics', 'notes'],
+                    column_config={
+                        "phone": st.column_config.TextColumn("Phone Number"),
+                        "Action": st.column_config.SelectboxColumn(
+                            "Action",
+                            options=["", "📞 Start Call", "🧠 View Memory", "✏️ Edit", "🗑️ Archive"],
+                            help="Choose an action for this user",
+                        ),
+                        "topics": st.column_config.ListColumn("Topics"),
+                    }
+                )
+
+                action_row_index = edited_df[edited_df['Action'] != ""].index
+                if not action_row_index.empty:
+                    idx = action_row_index[0]
+                    selected_action = edited_df.loc[idx, "Action"]
+                    user_info = st.session_state['users_df'].iloc[idx].to_dict()
+
+                    if selected_action == "📞 Start Call":
+                        st.session_state['user_for_call'] = user_info
+                        print("🔍 USER OBJECT DEBUG:")
+                        print(f"   Full user object: {st.session_state['user_for_call']}")
+                        print(f"   Keys: {list(st.session_state['user_for_call'].keys())}")
+                        redirect("pages/3_Call_Console.py", f"Preparing call for {user_info['name']}...", icon="📞")
+
+                    elif selected_action == "🧠 View Memory":
+                        if not st.session_state.show_memory_dialog:
+                            st.session_state.selected_user_for_dialog = user_info
+                            st.session_state.show_memory_dialog = True
                             st.rerun()
 
-                        elif selected_action == "🗑️ Archive":
-                            try:
-                                user_id_to_delete = user_info['id']
-                                response = requests.delete(f"{backend_url}/users/{user_id_to_delete}")
-                                if response.status_code == 200:
-                                    st.toast(f"User {user_info['name']} archived successfully!", icon="✅")
-                                    st.rerun()
-                                else:
-                                    try:
-                                        error_details = response.json()
-                                        st.error(f"Failed to archive user. Backend Error: {error_details}")
-                                    except ValueError:
-                                        st.error(f"Failed to archive user. Status Code: {response.status_code}")
-                            except Exception as e:
-                                st.error(f"An error occurred: {e}")
-                else:
-                    st.info("No users found. Add a new user to see them here.")
+                    elif selected_action == "✏️ Edit":
+                        st.session_state['user_to_edit'] = user_info
+                        st.rerun()
+
+                    elif selected_action == "🗑️ Archive":
+                        try:
+                            user_id_to_delete = user_info['id']
+                            response = api_client.delete(f"/users/{user_id_to_delete}")
+                            if response.status_code == 200:
+                                invalidate_user_caches()
+                                rerun_with(f"User {user_info['name']} archived successfully!", icon="✅")
+                            else:
+                                try:
+                                    error_details = response.json()
+                                    st.error(f"Failed to archive user. Backend Error: {error_details}")
+                                except ValueError:
+                                    st.error(f"Failed to archive user. Status Code: {response.status_code}")
+                        except Exception as e:
+                            st.error(f"An error occurred: {e}")
             else:
-                st.error("Failed to retrieve users from the backend.")
+                st.info("No users match your search." if search.strip() else "No users found. Add a new user to see them here.")
+
+            # --- Pagination ---
+            page_number = len(st.session_state.users_cursors)
+            prev_col, info_col, next_col = st.columns([1, 3, 1])
+            if prev_col.button("◀ Previous", disabled=page_number == 1, use_container_width=True):
+                st.session_state.users_cursors.pop()
+                st.rerun()
+            if total_users is not None:
+                info_col.caption(f"Page {page_number} · {total_users} user(s)")
+            else:
+                info_col.caption(f"Page {page_number}")
+            if next_col.button("Next ▶", disabled=not next_cursor, use_container_width=True):
+                st.session_state.users_cursors.append(next_cursor)
+                st.rerun()
+        except requests.exceptions.HTTPError:
+            st.error("Failed to retrieve users from the backend.")
         except requests.exceptions.ConnectionError:
-            st.error("Connection Error: Could not connect to the backend. Is it running?")
\ No newline at end of file
+            st.error("Connection Error: Could not connect to the backend. Is it running?")
+
+log_render_time()
@@ -5,154 +5,43 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from utils.auth_cookie import is_authenticated, inject_back_button_limiter, clear_auth, inject_navigation_blocker
-import time
+from utils.layout import log_render_time, setup_page
+from utils.call_logs import TRANSCRIPT_CACHE_SIZE, fetch_transcript, get_call_log_store
+from utils.call_rollups import ROLLUP_FREQUENCIES, TOPIC_WINDOWS
+from utils.html_templates import load_template
+from utils.lazy_imports import lazy_import
+from utils.user_directory import get_user_directory
+from utils.validation import USER_PERSONAS
 
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
-import altair as alt
-import requests
 from datetime import datetime, timedelta
-from collections import Counter
+import html
+import json
 
-# --- CRITICAL FIX: Add initialization flag to prevent premature checks ---
-if 'auth_initialized' not in st.session_state:
-    st.session_state.auth_initialized = False
+alt = lazy_import("altair")  # only loaded once there is mood data to chart
 
-# --- Show loading screen during first load ---
-if not st.session_state.auth_initialized:
-    with st.spinner("Loading..."):
-        time.sleep(0.3)  # Give time for session restoration
-        st.session_state.auth_initialized = True
-        st.rerun()
-
-# --- NOW check authentication (after initialization) ---
-inject_back_button_limiter()
-
-if not is_authenticated():
-    st.warning("⚠️ You are not logged in. Redirecting to login page...")
-    time.sleep(0.5)
-    st.switch_page("login.py")
-    st.stop()
-
-# --- Streamlit Page Config ---
-st.set_page_config(
-    page_title="Analytics",
-    page_icon="📊",
-    layout="wide"
-)
-
-# --- HIDE DEFAULT NAVIGATION ---
-st.markdown(
-    """
-    <style>
-        [data-testid="stSidebarNav"] {
-            display: none;
-        }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
-
-
-# --- CUSTOM SIDEBAR ---
-def custom_sidebar():
-    with st.sidebar:
-        st.title("Admin Menu")
-        st.page_link("pages/1_Users.py", label="Users", icon="👥")
-        st.page_link("pages/2_Schedules.py", label="Schedules", icon="🗓️")
-        st.page_link("pages/3_Call_Console.py", label="Call Console", icon="📞")
-        st.page_link("pages/4_Analytics.py", label="Analytics", icon="📊")
-        st.page_link("pages/5_Settings.py", label="Settings", icon="⚙️")
-        st.page_link("pages/6_Tech_Stack.py", label="Tech Stack", icon="💻")
-        st.markdown("---")
-
-        # Show session info
-        if st.session_state.get('login_time'):
-            from datetime import datetime
-            try:
-                login_time = datetime.fromisoformat(st.session_state.login_time)
-                st.caption(f"🕐 Logged in: {login_time.strftime('%I:%M %p')}")
-            except:
-                pass
-
-        # Initialize logout confirmation state
-        if 'show_logout_confirmation' not in st.session_state:
-            st.session_state.show_logout_confirmation = False
-
-        # Logout button - triggers confirmation dialog
-        if st.button("🚪 Logout", key="logout_button", use_container_width=True, type="primary"):
-            st.session_state.show_logout_confirmation = True
-            st.rerun()
-
-    # Logout Confirmation Dialog (outside sidebar)
-    if st.session_state.get('show_logout_confirmation', False):
-        @st.dialog("Confirm Logout")
-        def logout_confirmation_dialog():
-            st.warning("⚠️ Are you sure you want to logout?")
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                if st.button("✅ Yes, Logout", type="primary", use_container_width=True):
-                    # Clear authentication
-                    clear_auth()
-
-                    # Clear all session state except auth flags
-                    keys_to_preserve = ['authenticated', 'logout_triggered']
-                    for key in list(st.session_state.keys()):
-                        if key not in keys_to_preserve:
-                            del st.session_state[key]
-
-                    st.success("✅ Logged out successfully!")
-                    inject_navigation_blocker()
-
-                    time.sleep(0.5)
-                    st.switch_page("login.py")
-
-            with col2:
-                if st.button("❌ Cancel", use_container_width=True):
-                    st.session_state.show_logout_confirmation = False
-                    st.rerun()
-
-        logout_confirmation_dialog()
-
-
-custom_sidebar()
-
-backend_url = "http://127.0.0.1:8000"
+# --- Page config, auth guard and admin sidebar ---
+setup_page("Analytics", "📊")
 
 st.title("📊 Analytics Dashboard")
 
 
 # --- FETCH DATA ---
-@st.cache_data(ttl=60)
-def fetch_call_logs():
-    try:
-        response = requests.get(f"{backend_url}/calls/", timeout=5)
-        if response.status_code == 200:
-            return response.json()
-        return []
-    except Exception as e:
-        st.error(f"Error fetching call logs: {e}")
-        return []
+call_log_store = get_call_log_store()
+try:
+    call_log_store.sync()
+except Exception as e:
+    st.error(f"Error fetching call logs: {e}")
 
+# Shared, typed frame without transcripts (read-only)
+df = call_log_store.frame()
 
-call_logs = fetch_call_logs()
-
-if not call_logs:
+if df.empty:
     st.warning("🔭 No call data available yet. Make some calls to see analytics!")
     st.stop()
 
-# Convert to DataFrame
-df = pd.DataFrame(call_logs)
-
-# Parse dates
-df['start_time'] = pd.to_datetime(df['start_time'])
-df['end_time'] = pd.to_datetime(df['end_time'])
-df['date'] = df['end_time'].dt.date
-df['duration_seconds'] = (df['end_time'] - df['start_time']).dt.total_seconds()
-
 
 def format_duration(seconds):
     minutes = int(seconds // 60)
@@ -160,11 +49,65 @@ def format_duration(seconds):
     return f"{minutes}m {secs}s"
 
 
-df['duration_display'] = df['duration_seconds'].apply(format_duration)
+MOOD_DISPLAY = {
+    'happy': '😊 Happy',
+    'sad': '😢 Sad',
+    'neutral': '😐 Neutral'
+}
+
+
+def format_calls_for_display(calls):
+    """
+    Display columns for the rows actually shown, built with vectorized string ops.
+    `calls` is the visible slice only, never the whole history.
+    """
+    seconds = calls['duration_seconds'].fillna(0).astype(int)
+    summary = calls['summary'].fillna('')
+    preview = summary.str.slice(0, 60)
+    return pd.DataFrame({
+        'id': calls['id'],
+        'User': calls['user_name'],
+        'Date': calls['end_time'].dt.strftime('%b %d, %Y %H:%M').fillna("Unknown"),
+        'Duration': (seconds // 60).astype(str) + "m " + (seconds % 60).astype(str) + "s",
+        'Mood': calls['mood'].map(MOOD_DISPLAY),
+        'Summary': preview.where(summary.str.len() <= 60, preview + "..."),
+        'Action': "",
+    })
+
+
+RECENT_CALLS_PAGE_SIZES = [10, 20, 50]
+
+TRANSCRIPT_PLACEHOLDERS = {'messages': '__TRANSCRIPT_MESSAGES__'}
+USER_BUBBLE = ('<div class="message-row user"><div class="message-bubble user-bubble">'
+               '<div class="message-sender">👤 {sender}</div><div class="message-text">{text}</div></div></div>')
+AI_BUBBLE = ('<div class="message-row ai"><div class="message-bubble ai-bubble">'
+             '<div class="message-sender">🤖 AI Companion</div><div class="message-text">{text}</div></div></div>')
+
+
+@st.cache_data(max_entries=TRANSCRIPT_CACHE_SIZE, show_spinner=False)
+def render_transcript_bubbles(call_id, user_name):
+    """Escaped bubble HTML for every message of a call, built once per call id"""
+    sender = html.escape(str(user_name))
+    bubbles = []
+    for entry in fetch_transcript(call_id):
+        # Handle new dict format: {"speaker": "user", "text": "..."}
+        if isinstance(entry, dict):
+            text = html.escape(entry.get('text', ''))
+            if entry.get('speaker', 'unknown').lower() == 'user':
+                bubbles.append(USER_BUBBLE.format(sender=sender, text=text))
+            else:  # AI
+                bubbles.append(AI_BUBBLE.format(text=text))
+
+        # Handle legacy string format: "User: text" or "AI: text"
+        elif isinstance(entry, str):
+            if entry.startswith("User:"):
+                text = html.escape(entry.replace("User:", "").strip())
+                bubbles.append(USER_BUBBLE.format(sender=sender, text=text))
+            elif entry.startswith("AI:") or entry.startswith("Assistant:"):
+                text = html.escape(entry.replace("AI:", "").replace("Assistant:", "").strip())
+                bubbles.append(AI_BUBBLE.format(text=text))
+    return bubbles
 
-# Map moods to scores
-mood_scores = {'happy': 1, 'neutral': 0, 'sad': -1}
-df['mood_score'] = df['mood'].map(mood_scores).fillna(0)
 
 # --- MAIN LAYOUT: LEFT CONTENT + RIGHT SIDEBAR ---
 col_main, col_topics = st.columns([3, 1])
@@ -173,12 +116,41 @@ with col_main:
     # --- MOOD GRAPH ---
     st.subheader("📈 Mood Over Time")
 
-    mood_by_date = df.groupby('date').agg({
-        'mood_score': 'mean',
-        'id': 'count'
-    }).reset_index()
-    mood_by_date.columns = ['date', 'avg_mood', 'call_count']
-    mood_by_date['date'] = pd.to_datetime(mood_by_date['date'])
+    mood_rollup = call_log_store.mood_rollup
+    first_date, last_date = mood_rollup.date_bounds()
+    if first_date is None:
+        first_date = last_date = datetime.now().date()
+
+    col_range, col_period, col_slice, col_slice_value = st.columns([2, 1, 1, 1])
+    with col_range:
+        date_range = st.date_input("Date range", value=(first_date, last_date),
+                                   min_value=first_date, max_value=last_date)
+    with col_period:
+        period = st.selectbox("Period", list(ROLLUP_FREQUENCIES), key="mood_period")
+    with col_slice:
+        slice_by = st.selectbox("Show", ["All users", "User", "Persona"], key="mood_slice")
+
+    # Restrict the rollup to one user or to every user with a persona
+    slice_user_ids = None
+    with col_slice_value:
+        if slice_by == "User":
+            user_names = mood_rollup.user_names
+            selected_user = st.selectbox("User", sorted(user_names, key=lambda uid: str(user_names[uid])),
+                                         format_func=lambda uid: user_names[uid], key="mood_user")
+            slice_user_ids = {selected_user}
+        elif slice_by == "Persona":
+            selected_persona = st.selectbox("Persona", USER_PERSONAS, key="mood_persona")
+            try:
+                slice_user_ids = {str(user.get('id')) for user in get_user_directory().users()
+                                  if user.get('persona') == selected_persona}
+            except Exception as e:
+                st.error(f"Could not load user personas: {e}")
+
+    # A range is only complete once both ends are picked
+    range_start, range_end = date_range if len(date_range) == 2 else (date_range[0], date_range[0])
+    mood_by_date, mood_counts = mood_rollup.series(
+        range_start, range_end, ROLLUP_FREQUENCIES[period], slice_user_ids
+    )
 
     if len(mood_by_date) > 0:
         chart = alt.Chart(mood_by_date).mark_line(
@@ -201,15 +173,16 @@ with col_main:
 
         # Metrics below chart
         col1, col2, col3 = st.columns(3)
+        total_calls = mood_by_date['call_count'].sum()
         with col1:
-            st.metric("Total Calls", len(df))
+            st.metric("Total Calls", total_calls)
         with col2:
-            overall_avg = df['mood_score'].mean()
+            overall_avg = (mood_by_date['avg_mood'] * mood_by_date['call_count']).sum() / total_calls
             mood_label = "😊 Positive" if overall_avg > 0.3 else "😢 Negative" if overall_avg < -0.3 else "😐 Neutral"
             st.metric("Overall Mood", mood_label)
         with col3:
-            mood_counts = df['mood'].value_counts()
-            most_common_mood = mood_counts.index[0] if len(mood_counts) > 0 else "neutral"
+            named_moods = [(mood, count) for mood, count in mood_counts.most_common() if mood]
+            most_common_mood = named_moods[0][0] if named_moods else "neutral"
             emoji = {'happy': '😊', 'sad': '😢', 'neutral': '😐'}.get(most_common_mood, '😐')
             st.metric("Most Common", f"{emoji} {most_common_mood.title()}")
     else:
@@ -220,28 +193,21 @@ with col_main:
     # --- RECENT CALLS TABLE ---
     st.subheader("📞 Recent Calls")
 
-    display_df = df.sort_values('end_time', ascending=False).head(20).copy()
+    page_size = st.selectbox("Calls per page", RECENT_CALLS_PAGE_SIZES, index=1, key="recent_calls_page_size")
+    if st.session_state.get('recent_calls_page_size_shown') != page_size:
+        st.session_state.recent_calls_page_size_shown = page_size
+        st.session_state.recent_calls_limit = page_size
 
-    # Format for display
-    display_df['date_display'] = display_df['end_time'].dt.strftime('%b %d, %Y %H:%M')
-    display_df['summary_preview'] = display_df['summary'].apply(
-        lambda x: x[:60] + "..." if len(x) > 60 else x
-    )
-    display_df['mood_display'] = display_df['mood'].map({
-        'happy': '😊 Happy',
-        'sad': '😢 Sad',
-        'neutral': '😐 Neutral'
-    })
+    # Top-K selection (O(N log k)) instead of sorting the whole history
+    limit = st.session_state.recent_calls_limit
+    dated = df['end_time'].notna()
+    display_df = df[dated].nlargest(limit, 'end_time')
+    # Calls without an end time come after the dated ones (how nlargest() orders NaT varies across pandas versions)
+    if len(display_df) < limit:
+        display_df = pd.concat([display_df, df[~dated].head(limit - len(display_df))])
 
     # ✅ FIX: Always show Action column (don't hide it when transcript is open)
-    table_df = display_df[[
-        'id', 'user_name', 'date_display', 'duration_display',
-        'mood_display', 'summary_preview'
-    ]].copy()
-
-    # ✅ Always initialize Action column to empty
-    table_df['Action'] = ""
-    table_df.columns = ['id', 'User', 'Date', 'Duration', 'Mood', 'Summary', 'Action']
+    table_df = format_calls_for_display(display_df)
 
     # ✅ Generate unique key based on whether transcript is showing
     # This forces the table to reset when transcript state changes
@@ -289,17 +255,22 @@ with col_main:
                     st.rerun()
                     break
 
+    col_shown, col_older = st.columns([3, 1])
+    col_shown.caption(f"Showing {len(display_df)} of {len(df)} calls")
+    if col_older.button("⏬ Load older", disabled=len(display_df) >= len(df), use_container_width=True):
+        st.session_state.recent_calls_limit += page_size
+        st.rerun()
+
 with col_topics:
     st.subheader("☁️ Top Topics")
 
-    # Collect all topics
-    all_topics = []
-    for topics in df['topics']:
-        if isinstance(topics, list):
-            all_topics.extend(topics)
+    topic_window = st.selectbox("Window", list(TOPIC_WINDOWS), key="topics_window")
+    topic_user_names = call_log_store.mood_rollup.user_names
+    topic_user = st.selectbox("User", [None] + sorted(topic_user_names, key=lambda uid: str(topic_user_names[uid])),
+                              format_func=lambda uid: "All users" if uid is None else topic_user_names[uid],
+                              key="topics_user")
 
-    topic_counts = Counter(all_topics)
-    top_topics = topic_counts.most_common(15)
+    top_topics = call_log_store.topic_index.most_common(15, topic_user, TOPIC_WINDOWS[topic_window])
 
     if top_topics:
         # Display as styled chips
@@ -362,6 +333,11 @@ with col_topics:
 if st.session_state.get('show_transcript', False):
     call_id = st.session_state.selected_call_id
     call = df[df['id'] == call_id].iloc[0]
+    try:
+        transcript_data = fetch_transcript(call_id)
+    except Exception as e:
+        st.error(f"Could not load transcript: {e}")
+        transcript_data = []
 
     st.markdown("---")
 
@@ -371,7 +347,8 @@ if st.session_state.get('show_transcript', False):
         col_header, col_close = st.columns([5, 1])
         with col_header:
             st.markdown(f"### 💬 {call['user_name']}'s Conversation")
-            st.caption(f"📅 {pd.to_datetime(call['end_time']).strftime('%B %d, %Y at %H:%M')}")
+            end_time = pd.to_datetime(call['end_time'])
+            st.caption(f"📅 {'Unknown date' if pd.isna(end_time) else end_time.strftime('%B %d, %Y at %H:%M')}")
         with col_close:
             # ✅ FIX: Clear both flags when closing
             if st.button("✕ Close", key="close_transcript_top", use_container_width=True, type="secondary"):
@@ -384,142 +361,22 @@ if st.session_state.get('show_transcript', False):
         # Metadata cards
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("⏱️ Duration", call['duration_display'])
+            st.metric("⏱️ Duration", format_duration(call['duration_seconds']))
         with col2:
             mood_emoji = {'happy': '😊', 'sad': '😢', 'neutral': '😐'}.get(call['mood'], '😐')
             st.metric("Mood", f"{mood_emoji} {call['mood'].title()}")
         with col3:
-            st.metric("💬 Messages", len(call.get('transcript', [])))
+            st.metric("💬 Messages", len(transcript_data))
 
         st.markdown("### 💬 Conversation")
 
-        # Handle both formats (old string format and new dict format)
-        if call.get('transcript'):
-            transcript_data = call['transcript']
-
-            st.markdown("""
-            <style>
-            .chat-window {
-                background: linear-gradient(to bottom, #e8eaf6 0%, #f5f5f5 100%);
-                border-radius: 16px;
-                padding: 25px;
-                max-height: 500px;
-                overflow-y: auto;
-                border: 2px solid #e0e0e0;
-                box-shadow: inset 0 2px 10px rgba(0,0,0,0.05);
-            }
-            .chat-window::-webkit-scrollbar {
-                width: 12px;
-            }
-            .chat-window::-webkit-scrollbar-track {
-                background: rgba(0,0,0,0.05);
-                border-radius: 10px;
-                margin: 10px;
-            }
-            .chat-window::-webkit-scrollbar-thumb {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                border-radius: 10px;
-                border: 2px solid rgba(255,255,255,0.3);
-            }
-            .message-bubble {
-                margin: 15px 0;
-                padding: 15px 20px;
-                border-radius: 18px;
-                max-width: 75%; 
-                animation: fadeIn 0.3s ease-in;
-                box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-                line-height: 1.6;
-            }
-            @keyframes fadeIn {
-                from { opacity: 0; transform: translateY(10px); }
-                to { opacity: 1; transform: translateY(0); }
-            }
-            .user-bubble {
-                background: linear-gradient(135deg, #212226 0%, #4a4251 100%);
-                color: white;
-                margin-left: auto;
-                text-align: right;
-                border-bottom-right-radius: 4px;
-            }
-            .ai-bubble {
-                background: white;
-                color: #333;
-                margin-right: auto;
-                border-bottom-left-radius: 4px;
-                border-left: 4px solid #667eea;
-            }
-            .message-sender {
-                font-size: 11px;
-                font-weight: 700;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-                margin-bottom: 8px;
-                opacity: 0.8;
-            }
-            .user-bubble .message-sender {
-                color: rgba(255,255,255,0.9);
-            }
-            .ai-bubble .message-sender {
-                color: #667eea;
-            }
-            .message-text {
-                font-size: 15px;
-                line-height: 1.6;
-            }
-            </style>
-            """, unsafe_allow_html=True)
-
-            # Build chat HTML with format detection
-            chat_html = '<div class="chat-window">'
-
-            for i, entry in enumerate(transcript_data):
-                # Handle new dict format: {"speaker": "user", "text": "..."}
-                if isinstance(entry, dict):
-                    speaker = entry.get('speaker', 'unknown')
-                    text = entry.get('text', '')
-
-                    # Escape HTML to prevent injection
-                    text = text.replace('<', '&lt;').replace('>', '&gt;')
-
-                    if speaker.lower() == 'user':
-                        chat_html += f'''<div style="display: flex; justify-content: flex-end;">
-                            <div class="message-bubble user-bubble">
-                                <div class="message-sender">👤 {call['user_name']}</div>
-                                <div class="message-text">{text}</div>
-                            </div>
-                        </div>'''
-                    else:  # AI
-                        chat_html += f'''<div style="display: flex; justify-content: flex-start;">
-                            <div class="message-bubble ai-bubble">
-                                <div class="message-sender">🤖 AI Companion</div>
-                                <div class="message-text">{text}</div>
-                            </div>
-                        </div>'''
-
-                # Handle legacy string format: "User: text" or "AI: text"
-                elif isinstance(entry, str):
-                    if entry.startswith("User:"):
-                        text = entry.replace("User:", "").strip()
-                        text = text.replace('<', '&lt;').replace('>', '&gt;')
-                        chat_html += f'''<div style="display: flex; justify-content: flex-end;">
-                            <div class="message-bubble user-bubble">
-                                <div class="message-sender">👤 {call['user_name']}</div>
-                                <div class="message-text">{text}</div>
-                            </div>
-                        </div>'''
-                    elif entry.startswith("AI:") or entry.startswith("Assistant:"):
-                        text = entry.replace("AI:", "").replace("Assistant:", "").strip()
-                        text = text.replace('<', '&lt;').replace('>', '&gt;')
-                        chat_html += f'''<div style="display: flex; justify-content: flex-start;">
-                            <div class="message-bubble ai-bubble">
-                                <div class="message-sender">🤖 AI Companion</div>
-                                <div class="message-text">{text}</div>
-                            </div>
-                        </div>'''
-
-            chat_html += '</div>'
-
-            st.markdown(chat_html, unsafe_allow_html=True)
+        if transcript_data:
+            bubbles = render_transcript_bubbles(call_id, call['user_name'])
+            # Escape "</" so message text can never close the JSON script block
+            messages_json = json.dumps(bubbles).replace('</', '<\\/')
+            components.html(load_template('transcript_viewer.html', TRANSCRIPT_PLACEHOLDERS).render(
+                messages=messages_json
+            ), height=550)
         else:
             st.warning("🔭 No transcript available for this call")
 
@@ -532,5 +389,10 @@ with col2:
         # Clear transcript state before refreshing
         st.session_state.show_transcript = False
         st.session_state.selected_call_id = None
-        st.cache_data.clear()
-        st.rerun()
\ No newline at end of file
+        try:
+            call_log_store.sync(force=True)
+        except Exception as e:
+            st.error(f"Error fetching call logs: {e}")
+        st.rerun()
+
+log_render_time()
@@ -7,120 +7,15 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from utils.auth_cookie import is_authenticated, inject_back_button_limiter, clear_auth, inject_navigation_blocker
-import time
+from utils.layout import log_render_time, setup_page
+from utils import api_client
 
 import streamlit as st
 import requests
 
-# --- CRITICAL FIX: Add initialization flag to prevent premature checks ---
-if 'auth_initialized' not in st.session_state:
-    st.session_state.auth_initialized = False
+# --- Page config, auth guard and admin sidebar ---
+setup_page("Settings", "⚙️")
 
-# --- Show loading screen during first load ---
-if not st.session_state.auth_initialized:
-    with st.spinner("Loading..."):
-        time.sleep(0.3)  # Give time for session restoration
-        st.session_state.auth_initialized = True
-        st.rerun()
-
-# --- NOW check authentication (after initialization) ---
-inject_back_button_limiter()
-
-if not is_authenticated():
-    st.warning("⚠️ You are not logged in. Redirecting to login page...")
-    time.sleep(0.5)
-    st.switch_page("login.py")
-    st.stop()
-# # --- Authentication Guard ---
-# if 'authenticated' not in st.session_state or not st.session_state.authenticated:
-#     st.warning("You are not logged in. Redirecting to login page...")
-#     st.switch_page("login.py")
-
-st.set_page_config(
-    page_title="Settings",
-    page_icon="⚙️",
-    layout="wide"
-)
-# --- 1. HIDE THE DEFAULT NAVIGATION SIDEBAR ---
-st.markdown(
-    """
-    <style>
-        [data-testid="stSidebarNav"] {
-            display: none;
-        }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
-
-
-# --- CUSTOM SIDEBAR ---
-def custom_sidebar():
-    with st.sidebar:
-        st.title("Admin Menu")
-        st.page_link("pages/1_Users.py", label="Users", icon="👥")
-        st.page_link("pages/2_Schedules.py", label="Schedules", icon="🗓️")
-        st.page_link("pages/3_Call_Console.py", label="Call Console", icon="📞")
-        st.page_link("pages/4_Analytics.py", label="Analytics", icon="📊")
-        st.page_link("pages/5_Settings.py", label="Settings", icon="⚙️")
-        st.page_link("pages/6_Tech_Stack.py", label="Tech Stack", icon="💻")
-        st.markdown("---")
-
-        # Show session info
-        if st.session_state.get('login_time'):
-            from datetime import datetime
-            try:
-                login_time = datetime.fromisoformat(st.session_state.login_time)
-                st.caption(f"🕐 Logged in: {login_time.strftime('%I:%M %p')}")
-            except:
-                pass
-
-        # Initialize logout confirmation state
-        if 'show_logout_confirmation' not in st.session_state:
-            st.session_state.show_logout_confirmation = False
-
-        # Logout button - triggers confirmation dialog
-        if st.button("🚪 Logout", key="logout_button", use_container_width=True, type="primary"):
-            st.session_state.show_logout_confirmation = True
-            st.rerun()
-
-    # Logout Confirmation Dialog (outside sidebar)
-    if st.session_state.get('show_logout_confirmation', False):
-        @st.dialog("Confirm Logout")
-        def logout_confirmation_dialog():
-            st.warning("⚠️ Are you sure you want to logout?")
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                if st.button("✅ Yes, Logout", type="primary", use_container_width=True):
-                    # Clear authentication
-                    clear_auth()
-
-                    # Clear all session state except auth flags
-                    keys_to_preserve = ['authenticated', 'logout_triggered']
-                    for key in list(st.session_state.keys()):
-                        if key not in keys_to_preserve:
-                            del st.session_state[key]
-
-                    st.success("✅ Logged out successfully!")
-                    inject_navigation_blocker()
-
-                    time.sleep(0.5)
-                    st.switch_page("login.py")
-
-            with col2:
-                if st.button("❌ Cancel", use_container_width=True):
-                    st.session_state.show_logout_confirmation = False
-                    st.rerun()
-
-        logout_confirmation_dialog()
-
-
-custom_sidebar()
-
-backend_url = "http://127.0.0.1:8000"
 st.title("⚙️ Settings")
 
 # --- DEFAULT FALLBACK PERSONAS ---
@@ -135,7 +30,7 @@ DEFAULT_PERSONAS = {
 @st.cache_data(ttl=300)  # Cache for 5 minutes
 def fetch_personas():
     try:
-        response = requests.get(f"{backend_url}/personas/")
+        response = api_client.get("/personas/")
         if response.status_code == 200:
             data = response.json()
             if data:
@@ -201,7 +96,7 @@ for i, name in enumerate(persona_names):
                     # This is an API call to the backend
                     try:
                         payload = {"name": name, "prompt": new_prompt}
-                        response = requests.post(f"{backend_url}/personas/", json=payload)
+                        response = api_client.post("/personas/", json=payload)
 
                         if response.status_code == 200:
                             st.toast(f"{name} persona updated successfully!", icon="✅")
@@ -235,4 +130,6 @@ with col_actions:
         st.session_state.conversation_template = ["Greeting", "Recall Memory", "Empathetic Check-in", "Topic Nudge",
                                                   "Closing"]
         st.toast("Conversation template has been reset.", icon="🔄")
-        st.rerun()
\ No newline at end of file
+        st.rerun()
+
+log_render_time()
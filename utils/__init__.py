@@ -0,0 +1,4 @@
+from dotenv import load_dotenv
+
+# Load .env once per process, before any utils module reads os.environ
+load_dotenv()
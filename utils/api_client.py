@@ -0,0 +1,75 @@
+# utils/api_client.py
+import os
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BACKEND_URL = os.getenv('BACKEND_URL', 'http://127.0.0.1:8000').rstrip('/')
+
+# (connect, read) timeouts in seconds, matched by longest path prefix
+DEFAULT_TIMEOUT = (3.05, 10)
+ENDPOINT_TIMEOUTS = {
+    '/calls/start': (3.05, 30),  # waits for the agent to be dispatched
+    '/calls/stop': (2, 2),
+    '/users/bulk': (3.05, 60),  # one request per IMPORT_BATCH_SIZE users
+    '/calls/': (3.05, 5),
+    '/memory/update': (3.05, 5),
+}
+
+# Only idempotent requests are retried; POSTs are sent once
+RETRY_METHODS = frozenset({'GET', 'PUT', 'DELETE'})
+RETRY_TOTAL = 3
+RETRY_CONNECT = 1  # a refused connection means the backend is down, fail fast
+RETRY_READ = 0  # a read timeout already waited the endpoint's full budget; retrying would multiply it
+RETRY_BACKOFF = 0.3  # seconds, doubled on every attempt
+POOL_MAXSIZE = 32
+
+
+@st.cache_resource
+def get_http_session():
+    """Process-wide keep-alive session with a pooled, retrying adapter"""
+    session = requests.Session()
+    retry = Retry(
+        total=RETRY_TOTAL,
+        connect=RETRY_CONNECT,
+        read=RETRY_READ,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=RETRY_METHODS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _timeout_for(path):
+    for prefix in sorted(ENDPOINT_TIMEOUTS, key=len, reverse=True):
+        if path.startswith(prefix):
+            return ENDPOINT_TIMEOUTS[prefix]
+    return DEFAULT_TIMEOUT
+
+
+def request(method, path, **kwargs):
+    """Send a request to the backend; `path` is relative to BACKEND_URL"""
+    kwargs.setdefault('timeout', _timeout_for(path))
+    return get_http_session().request(method, f"{BACKEND_URL}{path}", **kwargs)
+
+
+def get(path, **kwargs):
+    return request('GET', path, **kwargs)
+
+
+def post(path, **kwargs):
+    return request('POST', path, **kwargs)
+
+
+def put(path, **kwargs):
+    return request('PUT', path, **kwargs)
+
+
+def delete(path, **kwargs):
+    return request('DELETE', path, **kwargs)
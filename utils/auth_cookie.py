@@ -1,60 +1,81 @@
 # utils/auth_cookie.py
 import streamlit as st
 from datetime import datetime, timedelta
+import time
 import streamlit.components.v1 as components
-import json
 import os
-from pathlib import Path
+import secrets
+
+from utils.session_store import create_session_store, start_expiry_sweeper
 
 SESSION_TIMEOUT = 480  # 8 hours in minutes
-SESSION_FILE = Path(__file__).parent.parent / '.streamlit_session.json'
+SESSION_STORE_BACKEND = os.getenv('SESSION_STORE_BACKEND', 'memory')  # 'memory' or 'sqlite'
+ACTIVITY_FLUSH_INTERVAL = int(os.getenv('SESSION_ACTIVITY_FLUSH_SECONDS', '60'))  # seconds
+SESSION_COOKIE_NAME = 'wellness_session_id'
 
 
-def _read_session_file():
-    """Read session from file"""
-    try:
-        if SESSION_FILE.exists():
-            with open(SESSION_FILE, 'r') as f:
-                return json.load(f)
-    except Exception as e:
-        print(f"⚠️ Error reading session file: {e}")
-    return None
+@st.cache_resource
+def get_session_store():
+    """Process-wide session store shared by every page and browser session"""
+    store = create_session_store(SESSION_STORE_BACKEND)
+    start_expiry_sweeper(store)
+    return store
+
+
+def _browser_session_id():
+    """Session id for this browser: from session state, else from the session cookie"""
+    return st.session_state.get('session_id') or _cookie_session_id()
 
 
-def _write_session_file(data):
-    """Write session to file"""
+def _cookie_session_id():
     try:
-        with open(SESSION_FILE, 'w') as f:
-            json.dump(data, f)
-        return True
-    except Exception as e:
-        print(f"⚠️ Error writing session file: {e}")
-        return False
+        return st.context.cookies.get(SESSION_COOKIE_NAME)
+    except Exception:
+        return None
+
+
+def _sync_session_cookie():
+    """Write the session id cookie once per browser session so a page refresh can restore it"""
+    session_id = st.session_state.get('session_id')
+    if not session_id or st.session_state.get('_session_cookie_synced') == session_id:
+        return
+    if _cookie_session_id() != session_id:
+        components.html(f"""
+        <script>
+            parent.document.cookie = "{SESSION_COOKIE_NAME}={session_id}; path=/; max-age={SESSION_TIMEOUT * 60}; SameSite=Strict";
+        </script>
+        """, height=0)
+    st.session_state._session_cookie_synced = session_id
 
 
-def _delete_session_file():
-    """Delete session file"""
+def _flush_last_activity(force=False):
+    """Persist last_activity to the store at most once per ACTIVITY_FLUSH_INTERVAL"""
+    now = time.time()
+    last_flush = st.session_state.get('_activity_flushed_at', 0)
+    if not force and now - last_flush < ACTIVITY_FLUSH_INTERVAL:
+        return
     try:
-        if SESSION_FILE.exists():
-            SESSION_FILE.unlink()
-            print("🗑️ Session file deleted")
+        get_session_store().update(st.session_state.session_id, last_activity=st.session_state.last_activity)
+        st.session_state._activity_flushed_at = now
     except Exception as e:
-        print(f"⚠️ Error deleting session file: {e}")
+        print(f"⚠️ Error updating session store: {e}")
 
 
 def set_auth_cookie():
-    """Set authentication in session state and file"""
+    """Set authentication in session state and session store"""
     current_time = datetime.now()
     expire_time = current_time + timedelta(minutes=SESSION_TIMEOUT)
+    session_id = secrets.token_urlsafe(32)
 
     # Store in session state
+    st.session_state.session_id = session_id
     st.session_state.authenticated = True
     st.session_state.login_time = current_time.isoformat()
     st.session_state.last_activity = current_time.isoformat()
     st.session_state.expire_time = expire_time.isoformat()
     st.session_state.logout_triggered = False
 
-    # Store in file
+    # Store in session store
     session_data = {
         'authenticated': True,
         'login_time': current_time.isoformat(),
@@ -62,7 +83,11 @@ def set_auth_cookie():
         'expire_time': expire_time.isoformat()
     }
 
-    _write_session_file(session_data)
+    try:
+        get_session_store().put(session_id, session_data)
+        st.session_state._activity_flushed_at = time.time()
+    except Exception as e:
+        print(f"⚠️ Error writing session store: {e}")
 
     print(f"✅ Auth cookie set: {st.session_state.authenticated}")
 
@@ -70,9 +95,14 @@ def set_auth_cookie():
 def is_authenticated():
     """Check if user is authenticated"""
 
-    # First check if we need to restore from file
+    # First check if we need to restore from the session store
     if 'authenticated' not in st.session_state or not st.session_state.authenticated:
-        session_data = _read_session_file()
+        session_id = _browser_session_id()
+        try:
+            session_data = get_session_store().get(session_id) if session_id else None
+        except Exception as e:
+            print(f"⚠️ Error reading session store: {e}")
+            session_data = None
 
         if session_data and session_data.get('authenticated'):
             # Check if session is still valid
@@ -81,22 +111,22 @@ def is_authenticated():
 
                 if datetime.now() < expire_time:
                     # Restore session
+                    st.session_state.session_id = session_id
                     st.session_state.authenticated = True
                     st.session_state.login_time = session_data['login_time']
                     st.session_state.last_activity = datetime.now().isoformat()
                     st.session_state.expire_time = session_data['expire_time']
                     st.session_state.logout_triggered = False
 
-                    # Update last activity in file
-                    session_data['last_activity'] = st.session_state.last_activity
-                    _write_session_file(session_data)
+                    # Update last activity in the store
+                    _flush_last_activity(force=True)
 
-                    print("✅ Session restored from file")
+                    print("✅ Session restored from store")
                     return True
                 else:
                     # Session expired
                     print("⏰ Session expired")
-                    _delete_session_file()
+                    get_session_store().delete(session_id)
                     return False
             except Exception as e:
                 print(f"⚠️ Error checking session expiration: {e}")
@@ -127,14 +157,8 @@ def is_authenticated():
     # Update last activity
     st.session_state.last_activity = datetime.now().isoformat()
 
-    # Update file (non-blocking, don't wait for write)
-    try:
-        session_data = _read_session_file()
-        if session_data:
-            session_data['last_activity'] = st.session_state.last_activity
-            _write_session_file(session_data)
-    except:
-        pass
+    # Update store (throttled, no I/O on most reruns)
+    _flush_last_activity()
 
     return True
 
@@ -144,13 +168,21 @@ def clear_auth():
     st.session_state.authenticated = False
     st.session_state.logout_triggered = True
 
-    keys_to_clear = ['login_time', 'last_activity', 'expire_time']
+    session_id = st.session_state.get('session_id')
+
+    keys_to_clear = ['session_id', 'login_time', 'last_activity', 'expire_time',
+                     '_activity_flushed_at', '_session_cookie_synced']
     for key in keys_to_clear:
         if key in st.session_state:
             del st.session_state[key]
 
-    # Delete session file
-    _delete_session_file()
+    # Delete stored session
+    try:
+        if session_id:
+            get_session_store().delete(session_id)
+        print("🗑️ Stored session deleted")
+    except Exception as e:
+        print(f"⚠️ Error deleting stored session: {e}")
 
     print("🗑️ Auth cleared")
 
@@ -172,6 +204,7 @@ def inject_navigation_blocker():
 def inject_back_button_limiter():
     """Prevent back navigation to login page when authenticated"""
     if 'authenticated' in st.session_state and st.session_state.authenticated:
+        _sync_session_cookie()
         components.html("""
         <script>
             if (!sessionStorage.getItem('entryPage')) {
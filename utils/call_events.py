@@ -0,0 +1,164 @@
+# utils/call_events.py
+import json
+import threading
+import time
+from urllib.parse import quote
+
+import requests
+import streamlit as st
+
+from utils import api_client
+
+SUMMARY_FIELDS = ("id", "room_name", "summary", "mood", "topics", "new_followups")
+SUMMARY_POLL_INTERVAL = 2  # seconds, only used when the backend has no event stream
+SSE_READ_TIMEOUT = 30  # seconds without a byte (keep-alives included) before reconnecting
+WATCH_TIMEOUT = 600  # seconds before a watcher gives up on its own
+SSE_MAX_FAILURES = 5  # failed connections in a row before falling back to polling
+
+
+def fetch_call_summary(room_name, by_room=True):
+    """
+    Looks up the call logged for a LiveKit room.
+    Uses GET /calls/by-room/{room_name} (200 = call summary, 204 = not logged yet);
+    falls back to filtering GET /calls/ when the backend does not have that endpoint.
+    Returns: (dict of SUMMARY_FIELDS or None, whether /calls/by-room is available)
+    """
+    if by_room:
+        response = api_client.get(f"/calls/by-room/{quote(room_name, safe='')}", timeout=3)
+        if response.status_code == 200:
+            return response.json(), True
+        if response.status_code not in (404, 405):
+            return None, True
+        print("⚠️ /calls/by-room not available - falling back to /calls/")
+
+    response = api_client.get("/calls/", params={"include_transcript": "false"}, timeout=3)
+    if response.status_code != 200:
+        return None, False
+    all_calls = response.json()
+    print(f"📊 Got {len(all_calls)} total calls from backend")
+    room_matches = [c for c in all_calls if c.get("room_name") == room_name]
+    print(f"🎯 Found {len(room_matches)} call(s) with room_name={room_name}")
+    if not room_matches:
+        return None, False
+    return {field: room_matches[0].get(field) for field in SUMMARY_FIELDS if field in room_matches[0]}, False
+
+
+class SummaryWatcher:
+    """
+    Waits for a room's call summary on a background thread.
+    Subscribes to GET /calls/by-room/{room_name}/events (server-sent events, `summary` event);
+    if the backend has no event stream it polls fetch_call_summary() instead.
+    `ready` is set once `summary` holds the call summary.
+    """
+
+    def __init__(self, room_name):
+        self.room_name = room_name
+        self.summary = None
+        self.ready = threading.Event()
+        self._stopped = threading.Event()
+        self._deadline = time.time() + WATCH_TIMEOUT
+        self._thread = threading.Thread(target=self._run, name=f"summary-watcher-{room_name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _active(self):
+        return not self._stopped.is_set() and not self.ready.is_set() and time.time() < self._deadline
+
+    def _deliver(self, summary):
+        if summary and summary.get("summary"):
+            self.summary = summary
+            self.ready.set()
+            print(f"✅ Summary delivered for room {self.room_name}")
+
+    def _run(self):
+        try:
+            if not self._listen():
+                self._poll()
+        except Exception as e:
+            print(f"❌ Summary watcher error for room {self.room_name}: {e}")
+
+    def _listen(self):
+        """
+        Consume the event stream, reconnecting when it drops.
+        Returns False if the backend does not provide one or it keeps failing, so the caller polls instead.
+        """
+        path = f"/calls/by-room/{quote(self.room_name, safe='')}/events"
+        failures = 0
+        while self._active():
+            if failures >= SSE_MAX_FAILURES:
+                print(f"⚠️ Summary event stream failed {failures} times in a row - polling instead")
+                return False
+            try:
+                with api_client.get(path, stream=True, timeout=(3.05, SSE_READ_TIMEOUT),
+                                    headers={"Accept": "text/event-stream"}) as response:
+                    content_type = response.headers.get("Content-Type", "")
+                    if response.status_code in (404, 405) or (
+                            response.status_code == 200 and not content_type.startswith("text/event-stream")):
+                        print("⚠️ Summary event stream not available - polling instead")
+                        return False
+                    if response.status_code != 200:
+                        failures += 1
+                        self._stopped.wait(SUMMARY_POLL_INTERVAL)
+                        continue
+                    event, data = None, []
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not self._active():
+                            break
+                        if line.startswith("event:"):
+                            event = line[6:].strip()
+                        elif line.startswith("data:"):
+                            data.append(line[5:].strip())
+                        elif not line:
+                            if event == "summary" and data:
+                                self._deliver(json.loads("\n".join(data)))
+                            event, data = None, []
+                            failures = 0  # a complete event (or keep-alive) came through
+                if self._active():
+                    # The stream ended without a summary; don't reconnect in a tight loop
+                    failures += 1
+                    print(f"⚠️ Summary event stream for room {self.room_name} closed without a summary")
+                    self._stopped.wait(SUMMARY_POLL_INTERVAL)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                # Read timeouts, streams dropped mid-response (ChunkedEncodingError) and
+                # malformed `data:` payloads all end up here; reconnect
+                failures += 1
+                print(f"⚠️ Summary event stream error for room {self.room_name}: {e}")
+                self._stopped.wait(SUMMARY_POLL_INTERVAL)
+        return True
+
+    def _poll(self):
+        by_room = True
+        while self._active():
+            try:
+                summary, by_room = fetch_call_summary(self.room_name, by_room)
+                self._deliver(summary)
+            except Exception as e:
+                print(f"⚠️ Summary poll failed: {e}")
+            self._stopped.wait(SUMMARY_POLL_INTERVAL)
+
+
+@st.cache_resource
+def _summary_watchers():
+    return {}, threading.Lock()
+
+
+def watch_call_summary(room_name):
+    """Return the process-wide SummaryWatcher for a room, starting one if needed"""
+    watchers, lock = _summary_watchers()
+    with lock:
+        watcher = watchers.get(room_name)
+        finished = watcher is not None and not watcher._thread.is_alive() and not watcher.ready.is_set()
+        if watcher is None or watcher._stopped.is_set() or finished:
+            watcher = SummaryWatcher(room_name)
+            watchers[room_name] = watcher
+        return watcher
+
+
+def stop_watching_call_summary(room_name):
+    watchers, lock = _summary_watchers()
+    with lock:
+        watcher = watchers.pop(room_name, None)
+    if watcher:
+        watcher.stop()
@@ -0,0 +1,253 @@
+# utils/call_logs.py
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+from utils import api_client
+from utils.call_rollups import MOOD_SCORES, MoodRollup, TopicIndex
+
+CALL_LOG_SYNC_INTERVAL = 60  # seconds between automatic syncs
+CALL_STORE_DIR = Path(__file__).parent.parent / '.analytics_store'
+CALL_STORE_STATE = '_state.json'
+CALL_STORE_FORMAT = 2  # bumped when stored values must be re-fetched; 2: ISO-8601 timestamp parsing
+CALL_STORE_MAX_PARTS = 8  # part files a date partition may hold before it is compacted into one
+TRANSCRIPT_CACHE_SIZE = 16  # transcripts kept in memory, least recently used dropped first
+
+CALL_SCHEMA = pa.schema([
+    ('id', pa.string()),
+    ('room_name', pa.string()),
+    ('user_id', pa.string()),
+    ('user_name', pa.string()),
+    ('start_time', pa.timestamp('us')),
+    ('end_time', pa.timestamp('us')),
+    ('mood', pa.string()),
+    ('topics', pa.list_(pa.string())),
+    ('summary', pa.string()),
+    ('fingerprint', pa.string()),
+    ('seq', pa.int64()),  # sync batch number, the latest copy of a call wins
+])
+
+# Columns the Analytics page reads
+ANALYTICS_COLUMNS = ['id', 'user_name', 'start_time', 'end_time', 'mood', 'summary', 'seq']
+# Columns that feed the in-memory indexes (fingerprints, mood rollups, topic index)
+INDEX_COLUMNS = ['id', 'fingerprint', 'user_id', 'user_name', 'end_time', 'mood', 'topics', 'seq']
+
+
+def _fingerprint(call):
+    call = {key: value for key, value in call.items() if key != 'transcript'}
+    return hashlib.sha1(json.dumps(call, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _to_timestamps(values):
+    """
+    ISO-8601 strings -> naive UTC timestamp array. Each value is parsed on its own terms
+    (fractions and offsets may vary from row to row, as datetime.isoformat() output does);
+    missing values become null and values that do not parse are reported, then stored as null.
+    """
+    values = pd.Series(values, dtype=object)
+    parsed = pd.to_datetime(values, format='ISO8601', errors='coerce', utc=True)
+    unparsed = values[parsed.isna() & values.notna() & (values != '')]
+    if not unparsed.empty:
+        print(f"⚠️ {len(unparsed)} timestamp(s) are not ISO-8601 and were stored as missing, "
+              f"e.g. {unparsed.iloc[0]!r}")
+    return pa.Array.from_pandas(parsed.dt.tz_localize(None)).cast(pa.timestamp('us'), safe=False)
+
+
+def _optional_str(value):
+    return None if value is None else str(value)
+
+
+def _utc_timestamp(value):
+    """ISO-8601 string -> UTC pd.Timestamp (naive values are taken as UTC, like _to_timestamps); None if unparseable"""
+    if not value:
+        return None
+    parsed = pd.to_datetime(value, errors='coerce', utc=True)
+    return None if pd.isna(parsed) else parsed
+
+
+class CallLogStore:
+    """
+    Call history kept on disk as a date-partitioned Parquet dataset (date=YYYY-MM-DD/part-<seq>-<random>.parquet).
+    Each sync adds one part per touched date; a date with more than CALL_STORE_MAX_PARTS parts is
+    rewritten as a single file holding the latest copy of each call.
+    Synced with GET /calls/?updated_after=<high-water mark>, so only new or changed calls are
+    downloaded and appended. The mark is the latest `updated_at` (or `end_time`) seen, compared as UTC
+    timestamps and stored/sent as a canonical UTC ISO-8601 string.
+    """
+
+    def __init__(self, path=CALL_STORE_DIR):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._synced_at = 0.0
+        self._frame = None
+        state = self._load_state()
+        self._high_water_mark = _utc_timestamp(state.get('high_water_mark'))
+        outdated = state.get('format', 1) < CALL_STORE_FORMAT
+        self._seq = state.get('seq', 0)
+        self._fingerprints = {}  # call id -> fingerprint of the stored copy
+        self.mood_rollup = MoodRollup()
+        self.topic_index = TopicIndex()
+        for partition in self.path.glob('date=*'):
+            self._compact(partition)
+        stored = self._read(INDEX_COLUMNS)
+        if stored is not None:
+            self._index(stored)
+            undated = stored.loc[stored['end_time'].isna(), 'id']
+            if outdated and not undated.empty:
+                # Older stores lost timestamps whose format differed from the first of their batch:
+                # forget those calls and the mark, so the next sync fetches and re-files them
+                for call_id in undated:
+                    self._fingerprints.pop(call_id, None)
+                self._high_water_mark = None
+                print(f"🔁 Re-fetching {len(undated)} undated call(s) stored by an older version")
+        self.version = self._seq  # changes whenever a sync stores calls
+
+    def _load_state(self):
+        state_file = self.path / CALL_STORE_STATE
+        return json.loads(state_file.read_text()) if state_file.exists() else {}
+
+    def _read(self, columns, filters=None):
+        """Memory-map the requested columns of every partition; None when the store is empty"""
+        if not any(self.path.glob('date=*/*.parquet')):
+            return None
+        table = pq.read_table(self.path, columns=columns, filters=filters, memory_map=True, partitioning='hive')
+        return table.to_pandas().sort_values('seq', kind='stable')
+
+    def _index(self, calls):
+        """Feed stored calls (a DataFrame in seq order) to the fingerprints, rollups and topic index"""
+        for call_id, fingerprint, user_id, user_name, end_time, mood, topics in zip(
+                calls['id'], calls['fingerprint'], calls['user_id'],
+                calls['user_name'], calls['end_time'], calls['mood'], calls['topics']):
+            self._fingerprints[call_id] = fingerprint
+            call_date = None if pd.isna(end_time) else end_time.date()
+            self.mood_rollup.add(call_id, call_date, user_id, user_name, mood)
+            self.topic_index.add(call_id, call_date, user_id, topics)
+
+    def _compact(self, partition):
+        """Rewrite a date partition as one part holding the latest copy of each call, once it has too many parts"""
+        parts = sorted(partition.glob('*.parquet'))
+        if len(parts) <= CALL_STORE_MAX_PARTS:
+            return
+        calls = pa.concat_tables([pq.read_table(part, schema=CALL_SCHEMA) for part in parts]).to_pandas()
+        calls = calls.sort_values('seq', kind='stable').drop_duplicates('id', keep='last')
+        # Written under a name _read() ignores, then renamed into place before the old parts go
+        staging = partition / f".compact-{uuid.uuid4().hex}.tmp"
+        pq.write_table(pa.Table.from_pandas(calls, schema=CALL_SCHEMA, preserve_index=False), staging)
+        os.replace(staging, partition / f"part-{int(calls['seq'].max()):08d}-{uuid.uuid4().hex[:8]}.parquet")
+        for part in parts:
+            part.unlink(missing_ok=True)
+        print(f"🗜️ Compacted {len(parts)} parts of {partition.name} into one ({len(calls)} calls)")
+
+    def _append(self, calls):
+        # Another process may share the store: continue after the highest seq on disk
+        self._seq = max(self._seq, self._load_state().get('seq', 0)) + 1
+        end_times = _to_timestamps([call.get('end_time') for call in calls])
+        table = pa.table({
+            'id': [str(call.get('id')) for call in calls],
+            'room_name': [_optional_str(call.get('room_name')) for call in calls],
+            'user_id': [_optional_str(call.get('user_id')) for call in calls],
+            'user_name': [_optional_str(call.get('user_name')) for call in calls],
+            'start_time': _to_timestamps([call.get('start_time') for call in calls]),
+            'end_time': end_times,
+            'mood': [_optional_str(call.get('mood')) for call in calls],
+            'topics': [[str(t) for t in call['topics']] if isinstance(call.get('topics'), list) else [] for call in calls],
+            'summary': [call.get('summary') or '' for call in calls],
+            'fingerprint': [_fingerprint(call) for call in calls],
+            'seq': [self._seq] * len(calls),
+        }, schema=CALL_SCHEMA)
+
+        dates = pd.Series(end_times.to_pandas()).dt.strftime('%Y-%m-%d').fillna('undated')
+        for date, rows in dates.groupby(dates).groups.items():
+            partition = self.path / f"date={date}"
+            partition.mkdir(exist_ok=True)
+            # The random suffix keeps processes that share the store from overwriting each other's parts
+            pq.write_table(table.take(pa.array(rows)), partition / f"part-{self._seq:08d}-{uuid.uuid4().hex[:8]}.parquet")
+            self._compact(partition)
+
+        self._index(table.select(INDEX_COLUMNS).to_pandas())
+        mark = None if self._high_water_mark is None else self._high_water_mark.isoformat()
+        state = {'high_water_mark': mark, 'seq': self._seq, 'format': CALL_STORE_FORMAT}
+        (self.path / CALL_STORE_STATE).write_text(json.dumps(state))
+        self.version = self._seq
+
+    def mark_stale(self):
+        """Make the next sync() fetch right away, e.g. after this app changed a call on the backend"""
+        with self._lock:
+            self._synced_at = 0.0
+
+    def sync(self, force=False):
+        """Fetch calls changed since the last sync and append them; returns how many arrived"""
+        with self._lock:
+            if not force and time.time() - self._synced_at < CALL_LOG_SYNC_INTERVAL:
+                return 0
+            # Metadata only; transcripts are fetched one call at a time by fetch_transcript()
+            params = {'include_transcript': 'false'}
+            if self._high_water_mark is not None:
+                params['updated_after'] = self._high_water_mark.isoformat()
+            response = api_client.get("/calls/", params=params)
+            response.raise_for_status()
+            # Backends that ignore updated_after resend everything; keep only real changes
+            changed = [call for call in response.json()
+                       if self._fingerprints.get(str(call.get('id'))) != _fingerprint(call)]
+            for call in changed:
+                mark = _utc_timestamp(call.get('updated_at') or call.get('end_time'))
+                if mark is not None and (self._high_water_mark is None or mark > self._high_water_mark):
+                    self._high_water_mark = mark
+            if changed:
+                self._append(changed)
+                print(f"📥 Stored {len(changed)} call log(s), {len(self._fingerprints)} in the store")
+            self._synced_at = time.time()
+            return len(changed)
+
+    def frame(self):
+        """
+        Latest copy of every call as a typed DataFrame.
+        Built once per store version and shared; treat it as read-only.
+        """
+        with self._lock:
+            if self._frame is None or self._frame[0] != self.version:
+                df = self._read(ANALYTICS_COLUMNS)
+                if df is None:
+                    df = CALL_SCHEMA.empty_table().select(ANALYTICS_COLUMNS).to_pandas()
+                df = df.drop_duplicates('id', keep='last').reset_index(drop=True)
+                df['date'] = df['end_time'].dt.date
+                df['duration_seconds'] = (df['end_time'] - df['start_time']).dt.total_seconds()
+                df['mood_score'] = df['mood'].map(MOOD_SCORES).fillna(0)
+                self._frame = (self.version, df)
+            return self._frame[1]
+
+
+@st.cache_resource
+def get_call_log_store():
+    return CallLogStore()
+
+
+@st.cache_data(max_entries=TRANSCRIPT_CACHE_SIZE, show_spinner=False)
+def fetch_transcript(call_id):
+    """
+    Transcript of one call from GET /calls/{id}/transcript, LRU-cached by call id.
+    Falls back to picking the call out of GET /calls/ on backends without that endpoint.
+    """
+    response = api_client.get(f"/calls/{quote(str(call_id), safe='')}/transcript")
+    if response.status_code == 200:
+        data = response.json()
+        return (data.get('transcript') or []) if isinstance(data, dict) else data
+    if response.status_code not in (404, 405):
+        response.raise_for_status()
+
+    print("⚠️ /calls/{id}/transcript not available - falling back to /calls/")
+    response = api_client.get("/calls/")
+    response.raise_for_status()
+    call = next((c for c in response.json() if str(c.get('id')) == str(call_id)), None)
+    return (call or {}).get('transcript') or []
@@ -0,0 +1,151 @@
+# utils/call_rollups.py
+import bisect
+import threading
+from collections import Counter
+from datetime import date as dt_date, timedelta
+
+import pandas as pd
+
+MOOD_SCORES = {'happy': 1, 'neutral': 0, 'sad': -1}
+ROLLUP_FREQUENCIES = {'Daily': 'D', 'Weekly': 'W', 'Monthly': 'M'}
+TOPIC_WINDOWS = {'All time': None, 'Last 7 days': 7, 'Last 30 days': 30}
+
+
+def _mood_sum(moods):
+    return sum(MOOD_SCORES.get(mood, 0) * count for mood, count in moods.items())
+
+
+class MoodRollup:
+    """
+    Per-day, per-user mood counts, kept up to date as calls are stored.
+    Mood sums and call counts for any window are read from O(days) buckets
+    instead of aggregating every call.
+    """
+
+    def __init__(self):
+        self._days = {}  # date -> {user_id: Counter(mood -> calls)}
+        self._dates = []  # sorted keys of _days
+        self._calls = {}  # call id -> (date, user_id, mood) it was counted under
+        self.user_names = {}  # user id -> latest user name seen on a call
+        self._lock = threading.Lock()
+
+    def add(self, call_id, date, user_id, user_name, mood):
+        """Count a call, replacing its previous contribution if it was counted before"""
+        with self._lock:
+            previous = self._calls.pop(call_id, None)
+            if previous:
+                old_date, old_user, old_mood = previous
+                counts = self._days[old_date][old_user]
+                counts[old_mood] -= 1
+                if counts[old_mood] <= 0:
+                    del counts[old_mood]
+            if user_name:
+                self.user_names[user_id] = user_name
+            if date is None:
+                return
+            if date not in self._days:
+                self._days[date] = {}
+                bisect.insort(self._dates, date)
+            self._days[date].setdefault(user_id, Counter())[mood] += 1
+            self._calls[call_id] = (date, user_id, mood)
+
+    def date_bounds(self):
+        with self._lock:
+            return (self._dates[0], self._dates[-1]) if self._dates else (None, None)
+
+    def _window(self, start, end, user_ids):
+        """(date, Counter of moods) for every day with calls between start and end, inclusive"""
+        window = []
+        with self._lock:
+            lo = bisect.bisect_left(self._dates, start)
+            hi = bisect.bisect_right(self._dates, end)
+            for date in self._dates[lo:hi]:
+                moods = Counter()
+                for user_id, counts in self._days[date].items():
+                    if user_ids is None or user_id in user_ids:
+                        moods.update(counts)
+                if moods:
+                    window.append((date, moods))
+        return window
+
+    def series(self, start, end, frequency='D', user_ids=None):
+        """
+        Average mood and call count per period (a pandas period alias) between start and end.
+        Returns: (DataFrame with date, avg_mood, call_count; Counter of moods over the whole window)
+        """
+        totals = Counter()
+        rows = []
+        for date, moods in self._window(start, end, user_ids):
+            totals.update(moods)
+            rows.append((pd.Timestamp(date), _mood_sum(moods), sum(moods.values())))
+        series = pd.DataFrame(rows, columns=['date', 'mood_sum', 'call_count'])
+        if frequency != 'D' and not series.empty:
+            # Label every week / month by its first day
+            period_start = series['date'].dt.to_period(frequency).dt.start_time.rename('date')
+            series = series[['mood_sum', 'call_count']].groupby(period_start).sum().reset_index()
+        series['avg_mood'] = series['mood_sum'] / series['call_count']
+        return series[['date', 'avg_mood', 'call_count']], totals
+
+
+def normalize_topics(topics):
+    """Strip, lowercase and de-duplicate topics the way validate_topics() in utils/validation.py does"""
+    if topics is None:
+        return []
+    return sorted({str(topic).strip().lower() for topic in topics} - {''})
+
+
+def _discount(counter, topics):
+    for topic in topics:
+        counter[topic] -= 1
+        if counter[topic] <= 0:
+            del counter[topic]
+
+
+class TopicIndex:
+    """
+    Topic frequencies kept up to date as calls are stored or their topics are saved.
+    All-time counters (overall and per user) answer most_common(k) directly;
+    per-day buckets serve the rolling 7/30-day windows.
+    """
+
+    def __init__(self):
+        self._totals = Counter()
+        self._by_user = {}  # user id -> Counter
+        self._days = {}  # date -> {user_id: Counter}
+        self._dates = []  # sorted keys of _days
+        self._calls = {}  # call id -> (date, user_id, topics) it was counted under
+        self._lock = threading.Lock()
+
+    def add(self, call_id, date, user_id, topics):
+        """Count a call's topics, replacing its previous contribution if it was counted before"""
+        topics = normalize_topics(topics)
+        with self._lock:
+            previous = self._calls.pop(call_id, None)
+            if previous:
+                old_date, old_user, old_topics = previous
+                _discount(self._totals, old_topics)
+                _discount(self._by_user[old_user], old_topics)
+                if old_date is not None:
+                    _discount(self._days[old_date][old_user], old_topics)
+            self._totals.update(topics)
+            self._by_user.setdefault(user_id, Counter()).update(topics)
+            if date is not None:
+                if date not in self._days:
+                    self._days[date] = {}
+                    bisect.insort(self._dates, date)
+                self._days[date].setdefault(user_id, Counter()).update(topics)
+            self._calls[call_id] = (date, user_id, topics)
+
+    def most_common(self, k, user_id=None, days=None):
+        """Top k (topic, count) pairs, optionally for one user and/or the last `days` days"""
+        with self._lock:
+            if days is None:
+                counter = self._totals if user_id is None else self._by_user.get(user_id, Counter())
+                return counter.most_common(k)
+            counter = Counter()
+            start = dt_date.today() - timedelta(days=days - 1)
+            for date in self._dates[bisect.bisect_left(self._dates, start):]:
+                for bucket_user, counts in self._days[date].items():
+                    if user_id is None or bucket_user == user_id:
+                        counter.update(counts)
+            return counter.most_common(k)
@@ -0,0 +1,28 @@
+# utils/flash.py
+import streamlit as st
+
+FLASH_KEY = '_flash_messages'
+
+
+def flash(message, icon=None):
+    """Queue a toast for the next page render (survives st.rerun() and st.switch_page())"""
+    st.session_state.setdefault(FLASH_KEY, []).append((message, icon))
+
+
+def redirect(page, message=None, icon=None):
+    """Switch page right away, showing `message` as a toast on the destination page"""
+    if message:
+        flash(message, icon)
+    st.switch_page(page)
+
+
+def rerun_with(message, icon=None):
+    """Rerun the current page right away, showing `message` as a toast once it has rendered"""
+    flash(message, icon)
+    st.rerun()
+
+
+def show_flashes():
+    """Show and clear the queued toasts; called once per page render"""
+    for message, icon in st.session_state.pop(FLASH_KEY, []):
+        st.toast(message, icon=icon)
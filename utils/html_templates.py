@@ -0,0 +1,56 @@
+# utils/html_templates.py
+import os
+import re
+from pathlib import Path
+
+import streamlit as st
+
+COMPONENTS_DIR = Path(__file__).parent.parent / 'dashboard'
+
+
+class SegmentTemplate:
+    """HTML/JS text pre-split on its placeholders, so rendering is a single join"""
+
+    def __init__(self, text, placeholders=None):
+        # placeholders: {name: literal text in the file to substitute}
+        placeholders = placeholders or {}
+        self._segments = []
+        self._slots = []  # (segment index, placeholder name)
+        position = 0
+        if placeholders:
+            names_by_literal = {literal: name for name, literal in placeholders.items()}
+            pattern = re.compile("|".join(
+                re.escape(literal) for literal in sorted(names_by_literal, key=len, reverse=True)
+            ))
+            for match in pattern.finditer(text):
+                self._segments.append(text[position:match.start()])
+                self._slots.append((len(self._segments), names_by_literal[match.group()]))
+                self._segments.append("")
+                position = match.end()
+        self._segments.append(text[position:])
+        self.names = frozenset(name for _, name in self._slots)
+
+    def render(self, **values):
+        if not self._slots:
+            return self._segments[0]
+        parts = list(self._segments)
+        for index, name in self._slots:
+            parts[index] = values[name]
+        return "".join(parts)
+
+
+@st.cache_resource(max_entries=16)
+def _compile_template(path, mtime_ns, placeholders):
+    with open(path, 'r', encoding='utf-8') as file:
+        text = file.read()
+    print(f"📄 Compiled template {Path(path).name}")
+    return SegmentTemplate(text, dict(placeholders))
+
+
+def load_template(filename, placeholders=None):
+    """
+    Returns the compiled SegmentTemplate for a file in the dashboard folder.
+    Read and compiled once per process; recompiled only when the file's mtime changes.
+    """
+    path = str(COMPONENTS_DIR / filename)
+    return _compile_template(path, os.stat(path).st_mtime_ns, tuple(sorted((placeholders or {}).items())))
@@ -0,0 +1,114 @@
+# utils/layout.py
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from utils.auth_cookie import is_authenticated, inject_back_button_limiter, clear_auth
+from utils.flash import redirect, show_flashes
+
+# (page script, label, icon) for every entry of the admin menu
+SIDEBAR_PAGES = (
+    ("pages/1_Users.py", "Users", "👥"),
+    ("pages/2_Schedules.py", "Schedules", "🗓️"),
+    ("pages/3_Call_Console.py", "Call Console", "📞"),
+    ("pages/4_Analytics.py", "Analytics", "📊"),
+    ("pages/5_Settings.py", "Settings", "⚙️"),
+    ("pages/6_Tech_Stack.py", "Tech Stack", "💻"),
+)
+
+# Hides Streamlit's built-in multipage navigation; the admin menu replaces it
+HIDE_DEFAULT_NAV_CSS = """
+    <style>
+        [data-testid="stSidebarNav"] {
+            display: none;
+        }
+    </style>
+"""
+
+
+def setup_page(page_title, page_icon, layout="wide"):
+    """
+    Page config, auth guard, shared CSS and admin sidebar for a dashboard page.
+    Call first thing in every page under dashboard/pages/; redirects to login and stops the
+    script when the session is not authenticated. Pair with log_render_time() at the end.
+    """
+    st.session_state._page_render_start = (page_title, time.perf_counter())
+    st.set_page_config(page_title=page_title, page_icon=page_icon, layout=layout)
+
+    # The session store is read synchronously, so there is nothing to wait for before checking
+    inject_back_button_limiter()
+    if not is_authenticated():
+        redirect("login.py", "You are not logged in. Please login to continue.", icon="⚠️")
+
+    st.markdown(HIDE_DEFAULT_NAV_CSS, unsafe_allow_html=True)
+    custom_sidebar()
+    show_flashes()
+
+
+def log_render_time():
+    """Prints how long the page took to run since setup_page(), and keeps the latest timing per page"""
+    page_title, started = st.session_state.get('_page_render_start', (None, None))
+    if started is None:
+        return None
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    st.session_state.setdefault('page_render_times', {})[page_title] = elapsed_ms
+    print(f"⏱️ {page_title} rendered in {elapsed_ms:.1f} ms")
+    return elapsed_ms
+
+
+@st.cache_data(show_spinner=False)
+def _login_caption(login_time):
+    try:
+        return f"🕐 Logged in: {datetime.fromisoformat(login_time).strftime('%I:%M %p')}"
+    except (TypeError, ValueError):
+        return None
+
+
+def custom_sidebar():
+    with st.sidebar:
+        st.title("Admin Menu")
+        for page, label, icon in SIDEBAR_PAGES:
+            st.page_link(page, label=label, icon=icon)
+        st.markdown("---")
+
+        # Show session info
+        if st.session_state.get('login_time'):
+            caption = _login_caption(st.session_state.login_time)
+            if caption:
+                st.caption(caption)
+
+        # Logout button - triggers confirmation dialog
+        if st.button("🚪 Logout", key="logout_button", use_container_width=True, type="primary"):
+            st.session_state.show_logout_confirmation = True
+            st.rerun()
+
+    # Logout Confirmation Dialog (outside sidebar)
+    if st.session_state.get('show_logout_confirmation', False):
+        logout_confirmation_dialog()
+
+
+@st.dialog("Confirm Logout")
+def logout_confirmation_dialog():
+    st.warning("⚠️ Are you sure you want to logout?")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        if st.button("✅ Yes, Logout", type="primary", use_container_width=True):
+            # Clear authentication
+            clear_auth()
+
+            # Clear all session state except auth flags
+            keys_to_preserve = ['authenticated', 'logout_triggered']
+            for key in list(st.session_state.keys()):
+                if key not in keys_to_preserve:
+                    del st.session_state[key]
+
+            # login.py shows the toast and installs the navigation blocker
+            redirect("login.py", "Logged out successfully!", icon="✅")
+
+    with col2:
+        if st.button("❌ Cancel", use_container_width=True):
+            st.session_state.show_logout_confirmation = False
+            st.rerun()
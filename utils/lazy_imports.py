@@ -0,0 +1,24 @@
+# utils/lazy_imports.py
+import importlib
+
+
+class LazyModule:
+    """Stand-in for a module that is only imported on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            # import_module holds the import lock, so concurrent sessions import it once
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name):
+    """
+    Defer importing a heavy module (pandas, altair) until a code path uses it.
+    Usage: pd = lazy_import("pandas")
+    """
+    return LazyModule(name)
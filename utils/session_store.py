@@ -0,0 +1,178 @@
+# utils/session_store.py
+import heapq
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+MAX_SESSIONS = 10000
+SWEEP_INTERVAL = 60  # seconds
+SESSION_DB_FILE = Path(__file__).parent.parent / '.streamlit_sessions.db'
+
+
+def _expiry_timestamp(data):
+    """Return the record's expire_time as a unix timestamp"""
+    try:
+        return datetime.fromisoformat(data['expire_time']).timestamp()
+    except Exception:
+        return float('inf')
+
+
+class MemorySessionStore:
+    """In-process LRU session store with a heap-ordered expiry index"""
+
+    def __init__(self, max_entries=MAX_SESSIONS):
+        self.max_entries = max_entries
+        self._records = OrderedDict()
+        self._expiry_heap = []
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            entry = self._records.get(session_id)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if time.time() >= expires_at:
+                del self._records[session_id]
+                return None
+            self._records.move_to_end(session_id)
+            return dict(data)
+
+    def put(self, session_id, data):
+        expires_at = _expiry_timestamp(data)
+        with self._lock:
+            self._records[session_id] = (expires_at, dict(data))
+            self._records.move_to_end(session_id)
+            heapq.heappush(self._expiry_heap, (expires_at, session_id))
+            while len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+
+    def update(self, session_id, **fields):
+        with self._lock:
+            entry = self._records.get(session_id)
+            if entry is None:
+                return False
+            entry[1].update(fields)
+            self._records.move_to_end(session_id)
+            return True
+
+    def delete(self, session_id):
+        with self._lock:
+            self._records.pop(session_id, None)
+
+    def sweep_expired(self):
+        """Pop expired sessions off the heap; never scans live sessions"""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                expires_at, session_id = heapq.heappop(self._expiry_heap)
+                entry = self._records.get(session_id)
+                # Skip heap entries left behind by a re-login or an LRU eviction
+                if entry is not None and entry[0] == expires_at:
+                    del self._records[session_id]
+                    removed += 1
+            if len(self._expiry_heap) > 2 * len(self._records) + self.max_entries:
+                self._expiry_heap = [(exp, sid) for sid, (exp, _) in self._records.items()]
+                heapq.heapify(self._expiry_heap)
+        return removed
+
+
+class SQLiteSessionStore:
+    """SQLite-backed session store, shared by every Streamlit process on the host"""
+
+    def __init__(self, path=SESSION_DB_FILE):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA mmap_size=8388608")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)")
+        self._conn.commit()
+
+    def get(self, session_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, expires_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if time.time() >= row[1]:
+                self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                self._conn.commit()
+                return None
+            return json.loads(row[0])
+
+    def put(self, session_id, data):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, expires_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(data), _expiry_timestamp(data))
+            )
+            self._conn.commit()
+
+    def update(self, session_id, **fields):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            data = json.loads(row[0])
+            data.update(fields)
+            self._conn.execute(
+                "UPDATE sessions SET data = ? WHERE session_id = ?", (json.dumps(data), session_id)
+            )
+            self._conn.commit()
+            return True
+
+    def delete(self, session_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    def sweep_expired(self):
+        """Delete expired sessions through the expires_at index"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+            return cursor.rowcount
+
+
+def start_expiry_sweeper(store, interval=SWEEP_INTERVAL):
+    """Run store.sweep_expired() every `interval` seconds on a daemon thread"""
+    stop_event = threading.Event()
+
+    def _sweep():
+        while not stop_event.wait(interval):
+            try:
+                removed = store.sweep_expired()
+                if removed:
+                    print(f"🧹 Swept {removed} expired session(s)")
+            except Exception as e:
+                print(f"⚠️ Error sweeping sessions: {e}")
+
+    threading.Thread(target=_sweep, name="session-expiry-sweeper", daemon=True).start()
+    return stop_event
+
+
+SESSION_STORES = {
+    'memory': MemorySessionStore,
+    'sqlite': SQLiteSessionStore,
+}
+
+
+def create_session_store(backend):
+    """Build a session store by backend name ('memory' or 'sqlite')"""
+    try:
+        return SESSION_STORES[backend]()
+    except KeyError:
+        print(f"⚠️ Unknown session store '{backend}', falling back to memory")
+        return MemorySessionStore()
@@ -0,0 +1,141 @@
+# utils/user_directory.py
+import threading
+import time
+
+import streamlit as st
+
+from utils import api_client
+
+DIRECTORY_FRESH_SECONDS = 10  # reads within this window are served without asking the backend
+DIRECTORY_PAGE_SIZE = 500  # users per request when GET /users/ pages on the server
+USER_PAGE_SIZES = (10, 25, 50, 100)
+USER_SORT_FIELDS = ('name', 'phone', 'persona')
+USER_SEARCH_FIELDS = ('name', 'phone', 'topics')
+
+
+class UserDirectory:
+    """
+    Process-wide copy of GET /users/, shared by every page and session.
+    Revalidated with GET /users/changes?since=<cursor> (incremental deltas) when the backend
+    hands out a change cursor, otherwise with If-None-Match against the list's ETag.
+    """
+
+    def __init__(self):
+        self._users = {}  # user id -> user
+        self._etag = None
+        self._cursor = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Revalidate on the next read; call after creating, editing or archiving a user"""
+        with self._lock:
+            self._checked_at = 0.0
+
+    def users(self):
+        """Every user, revalidated at most every DIRECTORY_FRESH_SECONDS"""
+        with self._lock:
+            if not self._loaded or time.time() - self._checked_at >= DIRECTORY_FRESH_SECONDS:
+                if not (self._loaded and self._cursor and self._apply_changes()):
+                    self._revalidate()
+                self._checked_at = time.time()
+            return list(self._users.values())
+
+    def _apply_changes(self):
+        response = api_client.get("/users/changes", params={'since': self._cursor})
+        changes = response.json() if response.status_code == 200 else None
+        if not isinstance(changes, dict):
+            print("⚠️ User directory deltas not available - revalidating the full list")
+            self._cursor = None
+            return False
+        for user in changes.get('upserted', []):
+            self._users[user.get('id')] = user
+        for user_id in changes.get('deleted', []):
+            self._users.pop(user_id, None)
+        self._cursor = changes.get('cursor', self._cursor)
+        return True
+
+    def _revalidate(self):
+        headers = {'If-None-Match': self._etag} if self._loaded and self._etag else {}
+        response = api_client.get("/users/", headers=headers)
+        if response.status_code == 304:
+            return
+        response.raise_for_status()
+        self._users = {user.get('id'): user for user in _all_users(response.json())}
+        self._etag = response.headers.get('ETag')
+        self._cursor = response.headers.get('X-Users-Cursor')
+        self._loaded = True
+        print(f"📇 Loaded user directory ({len(self._users)} users)")
+
+
+def _all_users(data):
+    """
+    Every user from a GET /users/ body: either a plain list, or the paged
+    {"items": [...], "next_cursor": ...} envelope (see fetch_users_page), whose pages are followed
+    """
+    if not isinstance(data, dict):
+        return data
+    users = list(data.get('items') or [])
+    cursor = data.get('next_cursor')
+    while cursor:
+        response = api_client.get("/users/", params={'limit': DIRECTORY_PAGE_SIZE, 'cursor': cursor})
+        response.raise_for_status()
+        data = response.json()
+        users.extend(data.get('items') or [])
+        cursor = data.get('next_cursor')
+    return users
+
+
+@st.cache_resource
+def get_user_directory():
+    return UserDirectory()
+
+
+# Whether GET /users/ pages on the server; None until the first page is fetched
+_server_pagination = None
+
+
+def _matches(user, needle):
+    for field in USER_SEARCH_FIELDS:
+        value = user.get(field) or ''
+        values = value if isinstance(value, list) else [value]
+        if any(needle in str(item).lower() for item in values):
+            return True
+    return False
+
+
+def _paginate_locally(users, limit, cursor, sort, order, search):
+    """Same contract as the server, for backends whose GET /users/ returns a plain list"""
+    if search:
+        needle = search.strip().lower()
+        users = [user for user in users if _matches(user, needle)]
+    users = sorted(users, key=lambda user: str(user.get(sort) or '').lower(), reverse=(order == 'desc'))
+    start = int(cursor or 0)
+    end = start + limit
+    return users[start:end], (str(end) if end < len(users) else None), len(users)
+
+
+def fetch_users_page(limit, cursor=None, sort='name', order='asc', search=''):
+    """
+    Fetches one page of users from GET /users/?limit=&cursor=&sort=&order=&q=
+    The backend answers {"items": [...], "next_cursor": str|None, "total": int};
+    older backends return every user as a list, which is then paged here from the user directory.
+    Returns: (users on this page, cursor of the next page or None, total matching users or None)
+    """
+    global _server_pagination
+    if _server_pagination is False:
+        return _paginate_locally(get_user_directory().users(), limit, cursor, sort, order, search)
+
+    params = {'limit': limit, 'sort': sort, 'order': order}
+    if cursor:
+        params['cursor'] = cursor
+    if search:
+        params['q'] = search.strip()
+    response = api_client.get("/users/", params=params)
+    response.raise_for_status()
+    data = response.json()
+    _server_pagination = isinstance(data, dict) and 'items' in data
+    if _server_pagination:
+        return data['items'], data.get('next_cursor'), data.get('total')
+    return _paginate_locally(data, limit, cursor, sort, order, search)
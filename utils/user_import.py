@@ -0,0 +1,197 @@
+# utils/user_import.py
+import csv
+import zipfile
+from pathlib import Path
+
+from utils import api_client
+from utils.lazy_imports import lazy_import
+from utils.validation import DUPLICATE_PHONE_ERROR, validate_users
+
+pd = lazy_import("pandas")
+
+IMPORT_FILE_TYPES = ("csv", "xlsx")
+IMPORT_COLUMNS = ("name", "phone", "persona", "topics", "notes")
+REQUIRED_IMPORT_COLUMNS = ("name", "phone", "topics")
+IMPORT_CHUNK_ROWS = 2000  # rows read and validated at a time
+IMPORT_BATCH_SIZE = 500  # users per POST /users/bulk
+FIRST_DATA_ROW = 2  # spreadsheet row number of the first record, after the header
+
+# Whether the backend has POST /users/bulk; None until the first batch is sent
+_bulk_endpoint = None
+
+
+def _normalize_header(header):
+    return str(header or "").strip().lower()
+
+
+def _check_columns(columns):
+    missing = [column for column in REQUIRED_IMPORT_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}. Expected: {', '.join(IMPORT_COLUMNS)}")
+
+
+def _csv_chunks(file):
+    try:
+        for chunk in pd.read_csv(file, chunksize=IMPORT_CHUNK_ROWS, dtype=str, keep_default_na=False):
+            chunk.columns = [_normalize_header(column) for column in chunk.columns]
+            _check_columns(chunk.columns)
+            yield chunk.to_dict('records')
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError, csv.Error) as e:
+        raise ValueError(f"Not a readable CSV file - {e}") from e
+
+
+def _xlsx_chunks(file):
+    try:
+        import openpyxl
+    except ImportError:
+        raise ValueError("Reading .xlsx files needs the openpyxl package - upload a CSV instead")
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    # Read-only workbooks parse sheet XML lazily, so a damaged file can also fail midway through the rows
+    broken_file_errors = (zipfile.BadZipFile, InvalidFileException, KeyError, OSError, SyntaxError)
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except broken_file_errors as e:
+        raise ValueError(f"Not a readable .xlsx workbook - {e}") from e
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [_normalize_header(cell) for cell in next(rows, ())]
+        _check_columns(header)
+        chunk = []
+        for values in rows:
+            chunk.append(dict(zip(header, values)))
+            if len(chunk) == IMPORT_CHUNK_ROWS:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    except broken_file_errors as e:
+        raise ValueError(f"Not a readable .xlsx workbook - {e}") from e
+    finally:
+        workbook.close()
+
+
+def read_import_chunks(file):
+    """
+    Streams an uploaded CSV/XLSX file as lists of at most IMPORT_CHUNK_ROWS row dicts,
+    keyed by lowercased column header. Raises ValueError for unsupported files.
+    """
+    suffix = Path(getattr(file, 'name', '')).suffix.lower().lstrip('.')
+    if suffix == "csv":
+        return _csv_chunks(file)
+    if suffix == "xlsx":
+        return _xlsx_chunks(file)
+    raise ValueError(f"Unsupported file type .{suffix} - upload one of: {', '.join(IMPORT_FILE_TYPES)}")
+
+
+def _create_one_by_one(users):
+    errors = {}
+    for index, user in enumerate(users):
+        try:
+            response = api_client.post("/users/", json=user)
+            if response.status_code != 200:
+                errors[index] = f"Backend returned {response.status_code}: {response.text[:200]}"
+        except Exception as e:
+            errors[index] = f"Request failed: {e}"
+    return errors
+
+
+def create_users(users):
+    """
+    Creates a batch of validated users with POST /users/bulk {"users": [...]}.
+    The backend answers 200 with {"errors": [{"index": i, "error": str}, ...]} for rejected rows
+    (or a plain list of created users); backends without the endpoint get one POST /users/ per user.
+    Returns: {index in `users`: error message} for users that were not created
+    """
+    global _bulk_endpoint
+    if _bulk_endpoint is not False:
+        try:
+            response = api_client.post("/users/bulk", json={"users": users})
+        except Exception as e:
+            return {index: f"Request failed: {e}" for index in range(len(users))}
+        if response.status_code in (404, 405):
+            print("⚠️ /users/bulk not available - creating users one at a time")
+            _bulk_endpoint = False
+        elif response.status_code == 200:
+            _bulk_endpoint = True
+            try:
+                data = response.json()
+            except ValueError:
+                data = None  # a 200 without a JSON body still means the batch was created
+            rejected = data.get('errors', []) if isinstance(data, dict) else []
+            return {item['index']: item.get('error') or "Rejected by the backend"
+                    for item in rejected if isinstance(item, dict) and item.get('index') in range(len(users))}
+        else:
+            error = f"Backend returned {response.status_code}: {response.text[:200]}"
+            return {index: error for index in range(len(users))}
+    return _create_one_by_one(users)
+
+
+class UserImport:
+    """
+    One bulk import: validates an uploaded CSV/XLSX file chunk by chunk and creates the valid users in batches.
+    `created` and `report` keep the progress made so far, so they stay meaningful if run() raises midway.
+    """
+
+    def __init__(self, seen_phones):
+        self.seen_phones = seen_phones  # sanitized phones already registered; numbers created here are added
+        self.created = 0
+        self.rows_read = 0
+        self.report = []  # (row, name, phone, error) for rows that were skipped or rejected
+        self._pending = []  # (row, user) validated but not sent yet
+        self._pending_phones = set()
+        self._waiting = []  # (row, user) whose number belongs to a pending row; settled once that one is sent
+
+    def _queue(self, row, user):
+        phone = user['phone']
+        if phone in self.seen_phones:
+            self.report.append((row, user['name'], phone, DUPLICATE_PHONE_ERROR.format(phone=phone)))
+        elif phone in self._pending_phones:
+            self._waiting.append((row, user))
+        else:
+            self._pending.append((row, user))
+            self._pending_phones.add(phone)
+
+    def _submit(self, batch):
+        errors = create_users([user for _, user in batch])
+        self.created += len(batch) - len(errors)
+        for index, (row, user) in enumerate(batch):
+            self._pending_phones.discard(user['phone'])
+            if index in errors:
+                # A rejected number stays free for later rows of the file
+                self.report.append((row, user['name'], user['phone'], errors[index]))
+            else:
+                self.seen_phones.add(user['phone'])
+        waiting, self._waiting = self._waiting, []
+        for row, user in waiting:
+            self._queue(row, user)
+
+    def run(self, file, on_progress=None):
+        """
+        Imports `file`; on_progress(rows_read, created) is called after every chunk.
+        Raises ValueError for unreadable files and requests exceptions when the backend cannot be reached.
+        Returns: number of users created
+        """
+        for chunk in read_import_chunks(file):
+            start = FIRST_DATA_ROW + self.rows_read
+            valid, errors = validate_users(chunk, self.seen_phones, start=start)
+            for row, error in errors:
+                record = chunk[row - start]
+                self.report.append((row, str(record.get('name') or ''), str(record.get('phone') or ''), error))
+            self.rows_read += len(chunk)
+
+            for row, user in valid:
+                self._queue(row, user)
+            while len(self._pending) >= IMPORT_BATCH_SIZE:
+                batch, self._pending = self._pending[:IMPORT_BATCH_SIZE], self._pending[IMPORT_BATCH_SIZE:]
+                self._submit(batch)
+            if on_progress:
+                on_progress(self.rows_read, self.created)
+
+        if self._pending:
+            while self._pending:  # sending a batch can release rows that waited on it
+                batch, self._pending = self._pending[:IMPORT_BATCH_SIZE], self._pending[IMPORT_BATCH_SIZE:]
+                self._submit(batch)
+            if on_progress:
+                on_progress(self.rows_read, self.created)
+        return self.created
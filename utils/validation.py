@@ -0,0 +1,208 @@
+# utils/validation.py
+import re
+
+USER_PERSONAS = ("Friendly", "Calm", "Cheerful")
+
+NAME_MAX_LENGTH = 100
+PHONE_MIN_DIGITS = 8
+PHONE_MAX_DIGITS = 15
+TOPICS_MAX_COUNT = 10
+TOPIC_MAX_LENGTH = 50
+NOTES_MAX_LENGTH = 1000
+DUPLICATE_PHONE_ERROR = "Phone number {phone} is already registered or appears earlier in the file"
+
+# Compiled once at import; the Add/Edit forms validate on every rerun
+_NON_DIGITS = re.compile(r'[^0-9]')
+_REPEATED_DIGIT = re.compile(r'(\d)\1+')
+_REPEATING_GROUP = re.compile(r'(\d{2})\1{2,}|(\d{3})\2{2,}')
+_NAME_CHARS = re.compile(r"[a-zA-ZÀ-ÿ\s.\-']+")
+_HTML_TAG = re.compile(r'<[^>]*>')
+_RUN_OF_10 = re.compile(r'(.)\1{9,}')
+_RUN_OF_50 = re.compile(r'(.)\1{49,}')
+_HTML_SPECIAL = '&<>"\''  # exactly what html.escape() rewrites
+
+# (check, error) pairs applied in order to a stripped name; the first failing check wins
+_NAME_RULES = (
+    (lambda name: len(name) >= 2, "Name must be at least 2 characters long"),
+    (lambda name: len(name) <= NAME_MAX_LENGTH, f"Name cannot exceed {NAME_MAX_LENGTH} characters"),
+    (lambda name: not _RUN_OF_10.search(name), "Name contains too many repeated characters"),
+    # The allowed characters exclude '<', so this also rules out HTML tags
+    (lambda name: _NAME_CHARS.fullmatch(name),
+     "Name can only contain letters, spaces, dots, hyphens, and apostrophes. No numbers or special characters."),
+    (lambda name: '  ' not in name, "Name cannot contain multiple consecutive spaces"),
+)
+
+# Same for the digits of a sanitized phone number
+_PHONE_RULES = (
+    (str.isdigit, "Phone number must contain only digits"),
+    (lambda digits: len(digits) >= PHONE_MIN_DIGITS, f"Phone number must be at least {PHONE_MIN_DIGITS} digits long"),
+    (lambda digits: len(digits) <= PHONE_MAX_DIGITS, f"Phone number cannot exceed {PHONE_MAX_DIGITS} digits"),
+    (lambda digits: not _REPEATED_DIGIT.fullmatch(digits),
+     "Phone number cannot contain only repeated digits (e.g., 111111)"),
+    (lambda digits: not _REPEATING_GROUP.fullmatch(digits), "Phone number contains an invalid repeating pattern"),
+)
+
+
+def sanitize_phone_number(phone):
+    """
+    Sanitizes phone number by removing all non-numeric characters except + at the start.
+    Returns: sanitized_phone_number
+    """
+    if not phone:
+        return ""
+    cleaned = _NON_DIGITS.sub('', phone)
+    return '+' + cleaned if phone.lstrip().startswith('+') else cleaned
+
+
+def validate_phone_number(phone, raw_phone=""):
+    """
+    Validates phone number with comprehensive checks.
+    Returns: (is_valid, error_message, sanitized_phone)
+    """
+    if not phone:
+        return False, "Phone number is required", ""
+
+    sanitized = sanitize_phone_number(phone)
+    if not sanitized:
+        return False, "Please enter a valid phone number", ""
+
+    digits_only = sanitized[1:] if sanitized.startswith('+') else sanitized
+    for check, error in _PHONE_RULES:
+        if not check(digits_only):
+            return False, error, ""
+    return True, "", sanitized
+
+
+def validate_name(name):
+    """
+    Validates the name field with comprehensive checks.
+    Returns: (is_valid, error_message)
+    """
+    if not name:
+        return False, "Name is required"
+
+    stripped = name.strip()
+    if name != stripped:
+        return False, "Name cannot have leading or trailing spaces"
+
+    for check, error in _NAME_RULES:
+        if not check(stripped):
+            return False, error
+    return True, ""
+
+
+def validate_topics(topics_str):
+    """
+    Validates and sanitizes the comma-separated topics field in a single pass.
+    Returns: (is_valid, error_message, cleaned_topics_list) - topics lowercased and de-duplicated, in input order
+    """
+    if not topics_str or not topics_str.strip():
+        return False, "At least one topic is required", []
+
+    topics = {}
+    has_html = False
+    topic_error = ""  # first failing check of the first invalid topic
+    for topic in topics_str.split(','):
+        topic = topic.strip()
+        if not topic:
+            continue
+        if _HTML_TAG.search(topic):
+            has_html = True
+        topic = topic.lower()
+        if topic in topics:
+            continue
+        topics[topic] = None
+        if not topic_error:
+            if len(topic) > TOPIC_MAX_LENGTH:
+                topic_error = f"Each topic must be {TOPIC_MAX_LENGTH} characters or less"
+            elif len(topic) < 2:
+                topic_error = "Each topic must be at least 2 characters"
+            elif _RUN_OF_10.search(topic):
+                topic_error = "Topic contains too many repeated characters"
+
+    if not topics:
+        return False, "Please provide at least one valid topic", []
+    if has_html:
+        return False, "Topics cannot contain HTML tags", []
+    if len(topics) > TOPICS_MAX_COUNT:
+        return False, f"Maximum {TOPICS_MAX_COUNT} topics allowed", []
+    if topic_error:
+        return False, topic_error, []
+    return True, "", list(topics)
+
+
+def validate_notes(notes):
+    """
+    Validates the notes field for security and length.
+    Returns: (is_valid, error_message, sanitized_notes)
+    """
+    if not notes:
+        return True, "", ""  # Notes are optional
+
+    notes = notes.strip()
+    if len(notes) > NOTES_MAX_LENGTH:
+        return False, f"Notes cannot exceed {NOTES_MAX_LENGTH} characters (current: {len(notes)})", notes
+    if _RUN_OF_50.search(notes):
+        return False, "Notes contain too many repeated characters", notes
+    if any(char in notes for char in _HTML_SPECIAL):
+        return False, "Notes cannot contain HTML tags or special characters like <, >, &", notes
+    # Nothing for html.escape() to rewrite
+    return True, "", notes
+
+
+def _field(record, key):
+    value = record.get(key)
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if value != value:  # NaN from empty spreadsheet cells
+            return ""
+        if value.is_integer():  # phone numbers stored as numbers in a spreadsheet
+            value = int(value)
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value)
+    return str(value)
+
+
+def validate_users(records, seen_phones=(), start=0):
+    """
+    Validates many user records (dicts with name, phone, persona, topics, notes) in one pass,
+    e.g. rows of a bulk import.
+    seen_phones: sanitized phone numbers already taken (e.g. from the user directory). It is only read:
+    a number is taken once its user is created, so numbers repeated within `records` are left to the caller.
+    Rows are numbered from `start`, so chunks of a large file keep their row numbers.
+    Returns: (list of (row, user payload ready for POST /users/), list of (row, error_message))
+    """
+    valid, errors = [], []
+    for row, record in enumerate(records, start=start):
+        name = _field(record, 'name').strip()
+        name_valid, error = validate_name(name)
+        if not name_valid:
+            errors.append((row, error))
+            continue
+
+        phone_valid, error, phone = validate_phone_number(_field(record, 'phone'))
+        if not phone_valid:
+            errors.append((row, error))
+            continue
+        if phone in seen_phones:
+            errors.append((row, DUPLICATE_PHONE_ERROR.format(phone=phone)))
+            continue
+
+        persona = _field(record, 'persona').strip().title() or USER_PERSONAS[0]
+        if persona not in USER_PERSONAS:
+            errors.append((row, f"Persona must be one of: {', '.join(USER_PERSONAS)}"))
+            continue
+
+        topics_valid, error, topics = validate_topics(_field(record, 'topics'))
+        if not topics_valid:
+            errors.append((row, error))
+            continue
+
+        notes_valid, error, notes = validate_notes(_field(record, 'notes'))
+        if not notes_valid:
+            errors.append((row, error))
+            continue
+
+        valid.append((row, {"name": name, "phone": phone, "persona": persona, "topics": topics, "notes": notes}))
+    return valid, errors